@@ -1,14 +1,21 @@
+import atexit
 import base64
+import re
+import threading
 import time
 import traceback
+from collections import OrderedDict
 from contextlib import contextmanager
+from datetime import date, datetime, timedelta
 from functools import wraps
-from typing import Tuple, Optional
+from typing import Iterator, Tuple, Optional
 
 import pandas as pd
 import pymssql
 from cryptography.fernet import Fernet
 
+from UTIL.util import trace
+
 # ======================================================
 # 암호문(Env) 복호화 로더
 # ======================================================
@@ -52,21 +59,289 @@ def load_env_from_embedded(encrypted_env_b64: str = ENCRYPTED_ENV_B64, key: byte
         raise
 
 
+# ======================================================
+# 자격증명 캐시 (프로세스당 1회 복호화)
+# ======================================================
+_env_cache = None
+_env_source = (ENCRYPTED_ENV_B64, KEY)
+_env_decrypt_sec = None
+_env_reload_hooks = []
+_env_lock = threading.Lock()
+
+
+def get_env() -> dict:
+    """복호화된 env 를 캐시에서 반환. 최초 1회만 복호화하고 소요 시간을 기록."""
+    global _env_cache, _env_decrypt_sec
+    with _env_lock:
+        if _env_cache is None:
+            t0 = time.perf_counter()
+            _env_cache = load_env_from_embedded(*_env_source)
+            _env_decrypt_sec = time.perf_counter() - t0
+            print(f"[ENV] 자격증명 복호화 {_env_decrypt_sec * 1000:.1f} ms (1회)")
+        return _env_cache
+
+
+def invalidate_env_cache() -> None:
+    """캐시된 env 폐기. 다음 get_env() 호출 시 다시 복호화."""
+    global _env_cache
+    with _env_lock:
+        _env_cache = None
+
+
+def register_env_reload_hook(hook) -> None:
+    """reload_env() 후 호출될 콜백 등록 (예: 기존 커넥션 정리)"""
+    if hook not in _env_reload_hooks:
+        _env_reload_hooks.append(hook)
+
+
+def reload_env(encrypted_env_b64: Optional[str] = None, key: Optional[bytes] = None) -> dict:
+    """키 교체용: 새 암호문/키로 env 를 다시 읽고 등록된 훅을 실행"""
+    global _env_source
+    with _env_lock:
+        _env_source = (encrypted_env_b64 or _env_source[0], key or _env_source[1])
+    invalidate_env_cache()
+    env = get_env()
+    for hook in list(_env_reload_hooks):
+        try:
+            hook()
+        except Exception:
+            print(f"[ENV RELOAD HOOK ERROR] {traceback.format_exc()}")
+    return env
+
+
+def env_cache_info() -> dict:
+    with _env_lock:
+        return {"loaded": _env_cache is not None, "decrypt_sec": _env_decrypt_sec}
+
+
+# ======================================================
+# 커넥션 풀 (논리 DB 이름별: GP, GFOOD_B, GWCHUL, GYUN_N ...)
+# ======================================================
+POOL_MIN_SIZE = 0               # 유휴 정리 시에도 남겨둘 최소 커넥션 수
+POOL_MAX_SIZE = 8               # DB별 최대 커넥션 수 (사용 중 + 유휴)
+POOL_IDLE_TIMEOUT_SEC = 300     # 이 시간 이상 놀고 있는 커넥션은 정리
+POOL_PING_AFTER_SEC = 30        # 이 시간 이상 유휴였던 커넥션은 체크아웃 시 SELECT 1 확인
+POOL_ACQUIRE_TIMEOUT_SEC = 30   # 풀이 가득 찼을 때 대기 시간
+
+
+# 서버 콜레이션에 맞는 드라이버 charset (예: Korean_Wansung_CI_AS → "CP949").
+# 지정된 DB 는 fetch 시점에 올바르게 디코딩되므로 runquery 의 재인코딩을 생략한다.
+# 세 DB 모두 UTF-8 접속 시 문자열이 latin1 로 풀려 euc-kr 재인코딩이 필요했다(= 서버 데이터가 CP949).
+# env 의 {DB}_CHARSET 값이 있으면 그쪽이 우선 — "UTF-8" 로 두면 기존 재인코딩 경로로 돌아간다.
+DB_SERVER_CHARSET = {
+    "GP": "CP949",
+    "GFOOD_B": "CP949",
+    "GWCHUL": "CP949",
+}
+DEFAULT_CHARSET = "UTF-8"
+
+
+def server_charset(db_name: str) -> Optional[str]:
+    """DB 에 설정된 서버 charset. 미설정이면 None (UTF-8 접속 + 재인코딩 경로)"""
+    charset = get_env().get(f"{db_name}_CHARSET") or DB_SERVER_CHARSET.get(db_name)
+    if not charset or charset.upper().replace("-", "") == "UTF8":
+        return None
+    return charset
+
+
+def _connect(db_name: str, charset: Optional[str] = None) -> pymssql.Connection:
+    env = get_env()
+    server = env.get(f"{db_name}_SERVER")
+    user = env.get(f"{db_name}_USER")
+    password = env.get(f"{db_name}_PASSWORD")
+    database = env.get(f"{db_name}_DATABASE")
+
+    if not all([server, user, password, database]):
+        raise ValueError(f"{db_name} 관련 환경변수가 부족합니다.")
+
+    return pymssql.connect(
+        server=server, user=user, password=password,
+        database=database, charset=charset or server_charset(db_name) or DEFAULT_CHARSET,
+    )
+
+
+class ConnectionPool:
+    """논리 DB 하나에 대한 pymssql 커넥션 풀 (스레드 안전)"""
+
+    def __init__(self, db_name: str, min_size: int = POOL_MIN_SIZE, max_size: int = POOL_MAX_SIZE,
+                 idle_timeout: float = POOL_IDLE_TIMEOUT_SEC, ping_after: float = POOL_PING_AFTER_SEC):
+        self.db_name = db_name
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size, self.min_size)
+        self.idle_timeout = idle_timeout
+        self.ping_after = ping_after
+
+        self._idle = []          # [(conn, 반납 시각)] — 마지막이 가장 최근
+        self._in_use = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    # ------------------------------
+    # 체크아웃 / 반납
+    # ------------------------------
+    def acquire(self, timeout: float = POOL_ACQUIRE_TIMEOUT_SEC) -> pymssql.Connection:
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._cond:
+                self._evict_idle_locked()
+                while not self._idle and self._in_use >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise ConnectionError(f"{self.db_name} 커넥션 풀 고갈 (max={self.max_size})")
+                    self._cond.wait(remaining)
+                    self._evict_idle_locked()
+
+                item = self._idle.pop() if self._idle else None
+                self._in_use += 1
+
+            if item is None:
+                try:
+                    return _connect(self.db_name)
+                except Exception:
+                    self._forget()
+                    raise
+
+            conn, released_at = item
+            if time.monotonic() - released_at < self.ping_after or self._is_alive(conn):
+                return conn
+
+            # 죽은 커넥션: 버리고 다시 시도
+            self._close_quietly(conn)
+            self._forget()
+
+    def release(self, conn: pymssql.Connection, discard: bool = False) -> None:
+        if not discard:
+            try:
+                # 커밋되지 않은 작업은 기존 close() 와 동일하게 폐기
+                conn.rollback()
+            except Exception:
+                discard = True
+
+        with self._cond:
+            if not discard and not self._closed:
+                self._in_use -= 1
+                self._idle.append((conn, time.monotonic()))
+                self._evict_idle_locked()
+                self._cond.notify()
+                return
+
+        self._close_quietly(conn)
+        self._forget()
+
+    # ------------------------------
+    # 유휴 정리 / 상태
+    # ------------------------------
+    def evict_idle(self) -> int:
+        with self._cond:
+            return self._evict_idle_locked()
+
+    def close_all(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._close_quietly(conn)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {"db": self.db_name, "idle": len(self._idle), "in_use": self._in_use,
+                    "max": self.max_size}
+
+    def _evict_idle_locked(self) -> int:
+        now = time.monotonic()
+        keep, evicted = [], []
+        # 오래된 것부터 검사, min_size 만큼은 유지
+        excess = len(self._idle) - self.min_size
+        for conn, released_at in self._idle:
+            if excess > 0 and now - released_at >= self.idle_timeout:
+                evicted.append(conn)
+                excess -= 1
+            else:
+                keep.append((conn, released_at))
+        self._idle = keep
+        for conn in evicted:
+            self._close_quietly(conn)
+        return len(evicted)
+
+    def _forget(self) -> None:
+        with self._cond:
+            self._in_use -= 1
+            self._cond.notify()
+
+    @staticmethod
+    def _is_alive(conn: pymssql.Connection) -> bool:
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1")
+            cur.fetchall()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_quietly(conn: pymssql.Connection) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+_pools = {}                 # {db_name: ConnectionPool}
+_pool_config = {}           # {db_name: {min_size, max_size, ...}}
+_checked_out = {}           # {id(conn): ConnectionPool}
+_pools_lock = threading.Lock()
+
+
+def configure_pool(db_name: str, **kwargs) -> None:
+    """DB별 풀 설정 (min_size, max_size, idle_timeout, ping_after). 기존 풀은 유휴 커넥션을 닫고 재생성."""
+    with _pools_lock:
+        _pool_config[db_name] = kwargs
+        old = _pools.pop(db_name, None)
+    if old:
+        old.close_all()
+
+
+def _pool_settings() -> list:
+    with _pools_lock:
+        return [(name, dict(_pool_config.get(name, {}))) for name in _pools]
+
+
+def get_pool(db_name: str) -> ConnectionPool:
+    with _pools_lock:
+        pool = _pools.get(db_name)
+        if pool is None:
+            pool = ConnectionPool(db_name, **_pool_config.get(db_name, {}))
+            _pools[db_name] = pool
+        return pool
+
+
+def close_all_pools() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close_all()
+
+
+atexit.register(close_all_pools)
+
+
+def _reset_pools_on_env_reload() -> None:
+    """자격증명이 바뀌면 기존 자격증명으로 맺은 커넥션은 모두 폐기"""
+    for name, cfg in _pool_settings():
+        configure_pool(name, **cfg)
+
+
+register_env_reload_hook(_reset_pools_on_env_reload)
+
+
 def getdb(db_name: str) -> Tuple[Optional[pymssql.Connection], Optional[pymssql.Cursor]]:
+    """풀에서 커넥션을 빌려 (conn, cursor) 반환. 반드시 closedb(conn) 로 반납."""
     try:
-        env = load_env_from_embedded()
-        server = env.get(f"{db_name}_SERVER")
-        user = env.get(f"{db_name}_USER")
-        password = env.get(f"{db_name}_PASSWORD")
-        database = env.get(f"{db_name}_DATABASE")
-
-        if not all([server, user, password, database]):
-            raise ValueError(f"{db_name} 관련 환경변수가 부족합니다.")
-
-        conn = pymssql.connect(
-            server=server, user=user, password=password,
-            database=database, charset="UTF-8",
-        )
+        pool = get_pool(db_name)
+        conn = pool.acquire()
+        with _pools_lock:
+            _checked_out[id(conn)] = pool
         return conn, conn.cursor()
 
     except Exception:
@@ -75,9 +350,16 @@ def getdb(db_name: str) -> Tuple[Optional[pymssql.Connection], Optional[pymssql.
         return None, None
 
 
-def closedb(conn: pymssql.Connection) -> None:
+def closedb(conn: pymssql.Connection, discard: bool = False) -> None:
+    """풀에서 빌린 커넥션이면 반납, 아니면 닫기. discard=True 면 풀에 돌려놓지 않고 폐기."""
+    if not conn:
+        return
+    with _pools_lock:
+        pool = _checked_out.pop(id(conn), None)
     try:
-        if conn:
+        if pool is not None:
+            pool.release(conn, discard=discard)
+        else:
             conn.close()
     except pymssql.Error as e:
         print(f"[DB CLOSE ERROR] {e}")
@@ -85,44 +367,180 @@ def closedb(conn: pymssql.Connection) -> None:
 
 @contextmanager
 def db_connection(db_name: str):
-    """Context manager for DB connections. Raises ConnectionError on failure."""
+    """Context manager for pooled DB connections. Raises ConnectionError on failure."""
     conn, cur = getdb(db_name)
     if conn is None or cur is None:
         raise ConnectionError(f"DB 연결 실패: {db_name}")
+    broken = False
     try:
         yield conn, cur
+    except (pymssql.InterfaceError, pymssql.OperationalError):
+        broken = True
+        raise
     finally:
-        closedb(conn)
+        closedb(conn, discard=broken)
 
 
-def runquery(cursor: object, query: str, params: Optional[tuple] = None) -> Optional[pd.DataFrame]:
-    """SQL 실행 후 SELECT면 DataFrame 반환, 그 외 쿼리는 커밋만 수행"""
+_tx_depth = {}              # {id(conn): 중첩 깊이}
+_tx_lock = threading.Lock()
 
-    @timeit
-    def dfencoding_auto(df: pd.DataFrame) -> pd.DataFrame:
-        def decode_if_needed(val):
-            if isinstance(val, str):
-                try:
-                    return val.encode("latin1", errors="replace").decode("euc-kr", errors="replace")
-                except Exception:
-                    return val
-            return val
 
-        for col in df.select_dtypes(include="object").columns:
-            df[col] = df[col].apply(decode_if_needed)
+@contextmanager
+def transaction(conn: pymssql.Connection):
+    """
+    블록 안의 runquery/bulk_insert 자동 커밋을 막고 블록 종료 시 1회 커밋, 예외 시 롤백.
+    중첩되면 가장 바깥 블록에서만 커밋/롤백한다.
+
+        with db_connection(DB_NAME) as (conn, cur), transaction(conn):
+            ...
+    """
+    key = id(conn)
+    with _tx_lock:
+        depth = _tx_depth.get(key, 0)
+        _tx_depth[key] = depth + 1
+    try:
+        yield conn
+        if depth == 0:
+            conn.commit()
+    except BaseException:
+        if depth == 0:
+            try:
+                conn.rollback()
+            except pymssql.Error as e:
+                print(f"[DB ROLLBACK ERROR] {e}")
+        raise
+    finally:
+        with _tx_lock:
+            if depth == 0:
+                _tx_depth.pop(key, None)
+            else:
+                _tx_depth[key] = depth
+
+
+def in_transaction(conn: object) -> bool:
+    with _tx_lock:
+        return id(conn) in _tx_depth
+
+
+def _autocommit(cursor: object) -> None:
+    conn = cursor.connection
+    if not in_transaction(conn):
+        conn.commit()
+
+
+# ======================================================
+# 한글 재인코딩 (latin1 로 잘못 디코딩된 VARCHAR → euc-kr)
+# ======================================================
+ENCODING_SAMPLE_SIZE = 50       # 컬럼 판정 시 먼저 보는 값 개수
+ENCODING_CACHE_MAX = 5000       # 판정 캐시 최대 항목 수 (값이 박힌 동적 SQL 대비, 오래된 것부터 버림)
+_MANGLED_RE = re.compile(r"[\x80-\xff]")      # latin1 로 풀린 멀티바이트 흔적
+_UNICODE_RE = re.compile(r"[^\x00-\xff]")     # 이미 정상 유니코드(한글 등)
+_JOIN_SEP = "\x00"
+
+_column_encoding = {}           # {(db, 문장, column): True=재인코딩 필요 / False=그대로}
+_column_encoding_lock = threading.Lock()
+
+
+def _classify_text(text: str) -> Optional[bool]:
+    """True=깨진 한글, False=정상 유니코드, None=ASCII 뿐이라 판단 불가"""
+    if _UNICODE_RE.search(text):
+        return False
+    if _MANGLED_RE.search(text):
+        return True
+    return None
+
+
+def _detect_mangled(series: pd.Series) -> Optional[bool]:
+    """앞쪽 샘플로 먼저 판정하고, 판단 불가면 컬럼 전체(고유값)를 한 번에 검사"""
+    sample = [v for v in series.head(ENCODING_SAMPLE_SIZE) if isinstance(v, str)]
+    verdict = _classify_text("".join(sample))
+    if verdict is None and len(series) > ENCODING_SAMPLE_SIZE:
+        verdict = _classify_text("".join(v for v in pd.unique(series.dropna()) if isinstance(v, str)))
+    return verdict
+
+
+def _reencode_series(series: pd.Series) -> pd.Series:
+    """고유값만 모아 한 번에 latin1 → euc-kr 변환 후 매핑"""
+    uniques = [v for v in pd.unique(series.dropna()) if isinstance(v, str)]
+    if not uniques:
+        return series
+
+    decoded = None
+    if not any(_JOIN_SEP in v for v in uniques):
+        joined = _JOIN_SEP.join(uniques).encode("latin1", errors="replace")
+        decoded = joined.decode("euc-kr", errors="replace").split(_JOIN_SEP)
+        if len(decoded) != len(uniques):
+            decoded = None
+    if decoded is None:
+        decoded = [v.encode("latin1", errors="replace").decode("euc-kr", errors="replace") for v in uniques]
+
+    mapping = dict(zip(uniques, decoded))
+    return series.map(mapping).where(series.isin(mapping.keys()), series)
+
+
+@timeit
+def dfencoding_auto(df: pd.DataFrame, db_name: Optional[str] = None, statement: Optional[str] = None) -> pd.DataFrame:
+    """
+    문자열 컬럼 중 한글 깨짐 컬럼만 골라 일괄 재인코딩.
+    판정 결과는 (db, 문장, column) 단위로 기억해 같은 문장의 다음 조회부터는 검사를 생략한다.
+    (JOIN/별칭 쿼리는 같은 이름의 컬럼이 다른 테이블에서 올 수 있어 테이블이 아닌 문장 단위)
+    """
+    for col in df.select_dtypes(include=["object", "string"]).columns:
+        key = (db_name, statement, col) if db_name and statement else None
+        with _column_encoding_lock:
+            verdict = _column_encoding.get(key) if key else None
+
+        if verdict is None:
+            verdict = _detect_mangled(df[col])
+            if verdict is not None and key:
+                with _column_encoding_lock:
+                    _column_encoding[key] = verdict
+                    while len(_column_encoding) > ENCODING_CACHE_MAX:
+                        _column_encoding.pop(next(iter(_column_encoding)))
+
+        if verdict:
+            df[col] = _reencode_series(df[col])
+    return df
+
+
+def clear_encoding_cache() -> None:
+    with _column_encoding_lock:
+        _column_encoding.clear()
+
+
+def _db_name_of(cursor: object) -> Optional[str]:
+    conn = getattr(cursor, "connection", None)
+    with _pools_lock:
+        pool = _checked_out.get(id(conn))
+    return pool.db_name if pool else None
+
+
+def _statement_of(query: str) -> Optional[str]:
+    """판정 캐시 키용 문장 — 공백만 정규화 (파라미터는 %s 로 남아 있어 같은 문장은 같은 키)"""
+    text = " ".join(query.split())
+    return text or None
+
+
+def _to_frame(cursor: object, query: str, rows: list) -> pd.DataFrame:
+    columns = [col[0] for col in cursor.description]
+    df = pd.DataFrame(rows, columns=columns)
+    db_name = _db_name_of(cursor)
+    if db_name and server_charset(db_name):
         return df
+    return dfencoding_auto(df, db_name, _statement_of(query))
+
 
+def runquery(cursor: object, query: str, params: Optional[tuple] = None) -> Optional[pd.DataFrame]:
+    """SQL 실행 후 SELECT면 DataFrame 반환, 그 외 쿼리는 커밋만 수행 (transaction() 안이면 커밋 생략)"""
     try:
         cursor.execute(query, params or ())
         if query.strip().upper().startswith("SELECT"):
             rows = cursor.fetchall()
             if not rows:
                 return pd.DataFrame()
-            columns = [col[0] for col in cursor.description]
-            df = pd.DataFrame(rows, columns=columns)
-            return dfencoding_auto(df)
+            return _to_frame(cursor, query, rows)
         else:
-            cursor.connection.commit()
+            _autocommit(cursor)
     except pymssql.DatabaseError as db_err:
         print(f"[DB ERROR] {db_err}")
         print(traceback.format_exc())
@@ -133,6 +551,247 @@ def runquery(cursor: object, query: str, params: Optional[tuple] = None) -> Opti
     return None
 
 
+def runquery_iter(cursor: object, query: str, params: Optional[tuple] = None,
+                  chunk_size: int = 5000, as_frames: bool = True) -> Iterator:
+    """
+    SELECT 결과를 fetchmany 로 chunk_size 행씩 나눠 반환하는 제너레이터.
+    as_frames=True 면 청크별로 재인코딩한 DataFrame, False 면 row 튜플 리스트를 yield.
+    전체 결과를 메모리에 올리지 않으므로 PAN/MPAN/DASHBOARD_LOGS 대량 조회용.
+    (제너레이터를 끝까지 소비하기 전에는 같은 커서로 다른 쿼리를 실행하지 말 것)
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size 는 1 이상이어야 합니다.")
+
+    try:
+        cursor.execute(query, params or ())
+        if cursor.description is None:
+            return
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield _to_frame(cursor, query, rows) if as_frames else rows
+    except pymssql.DatabaseError as db_err:
+        print(f"[DB ERROR] {db_err}")
+        print(traceback.format_exc())
+        raise
+
+
+# ======================================================
+# 날짜 조건 (인덱스 seek 가능한 범위 조건)
+# ------------------------------------------------------
+# CONVERT(DATE, col) = %s 는 컬럼에 함수를 씌워 인덱스 seek 가 안 된다.
+# 같은 결과를 col >= d AND col < d+1 범위 조건으로 만든다.
+# ======================================================
+def _as_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if hasattr(value, "toPyDate"):     # QDate
+        return value.toPyDate()
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+def next_day(sdate) -> str:
+    """'yyyy-MM-dd' 다음날 문자열"""
+    return (_as_date(sdate) + timedelta(days=1)).strftime("%Y-%m-%d")
+
+
+def date_range(column: str, sdate) -> Tuple[str, list]:
+    """
+    하루 조건: ("col >= %s AND col < %s", [d, d+1])
+    ex) cond, p = date_range("sdate", sdate_str); runquery(cur, f"... WHERE {cond}", p)
+    """
+    d = _as_date(sdate)
+    return (f"{column} >= %s AND {column} < %s",
+            [d.strftime("%Y-%m-%d"), next_day(d)])
+
+
+def date_range_in(column: str, dates) -> Tuple[str, list]:
+    """
+    여러 날짜 조건 (CONVERT(DATE, col) IN (...) 대체).
+    연속된 날짜는 한 구간으로 합쳐 (col >= a AND col < b) OR ... 로 만든다.
+    """
+    days = sorted({_as_date(d) for d in dates})
+    if not days:
+        return "1 = 0", []
+
+    spans = []
+    start = prev = days[0]
+    for d in days[1:]:
+        if d != prev + timedelta(days=1):
+            spans.append((start, prev))
+            start = d
+        prev = d
+    spans.append((start, prev))
+
+    conds, params = [], []
+    for lo, hi in spans:
+        conds.append(f"({column} >= %s AND {column} < %s)")
+        params += [lo.strftime("%Y-%m-%d"), next_day(hi)]
+    return "(" + " OR ".join(conds) + ")", params
+
+
+# ======================================================
+# 조회 결과 캐시 (마스터성 테이블용, TTL + LRU)
+# ======================================================
+CACHE_TABLE_TTL_SEC = {         # 테이블별 TTL (대문자)
+    "MASTER": 600,
+    "MMASTER": 600,
+    "RECIPE": 600,
+    "DASHBOARD_UNAME_MAP": 300,
+    "SAME_PRODUCT": 300,
+}
+CACHE_DEFAULT_TTL_SEC = 60
+CACHE_MAX_ENTRIES = 1024
+_TABLES_RE = re.compile(r"\b(?:FROM|JOIN)\s+([\w\.\[\]#]+)", re.IGNORECASE)
+
+
+def _tables_of(query: str) -> set:
+    return {t.strip("[]").split(".")[-1].upper() for t in _TABLES_RE.findall(query)}
+
+
+def _normalize_sql(query: str) -> str:
+    return " ".join(query.split())
+
+
+class QueryCache:
+    """(db, 정규화 SQL, params) → DataFrame. 테이블별 TTL, LRU 퇴출, 히트/미스 카운터"""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # {key: (df, 만료 시각, tables)}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key) -> Optional[pd.DataFrame]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, df: pd.DataFrame, ttl: float, tables: set) -> None:
+        with self._lock:
+            self._entries[key] = (df, time.monotonic() + ttl, tables)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, table: Optional[str] = None, db_name: Optional[str] = None) -> int:
+        table = table.upper() if table else None
+        with self._lock:
+            keys = [
+                k for k, (_, _, tables) in self._entries.items()
+                if (table is None or table in tables) and (db_name is None or k[0] == db_name)
+            ]
+            for k in keys:
+                del self._entries[k]
+            return len(keys)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+query_cache = QueryCache()
+
+
+def cached_query(db_name: str, query: str, params: Optional[list] = None,
+                 ttl: Optional[float] = None, cursor: object = None) -> Optional[pd.DataFrame]:
+    """
+    SELECT 결과를 캐시에서 반환하고, 없으면 조회 후 저장. 반환 DataFrame 은 사본이므로 수정해도 안전.
+    cursor 를 넘기면 그 커서로 조회 (이미 열린 커넥션 재사용), 아니면 풀에서 커넥션을 빌린다.
+    ttl 미지정 시 조회 테이블 중 가장 짧은 CACHE_TABLE_TTL_SEC 값 (없으면 CACHE_DEFAULT_TTL_SEC).
+    """
+    tables = _tables_of(query)
+    key = (db_name, _normalize_sql(query), tuple(params or ()))
+
+    df = query_cache.get(key)
+    if df is None:
+        if cursor is not None:
+            df = runquery(cursor, query, params)
+        else:
+            with db_connection(db_name) as (conn, cur):
+                df = runquery(cur, query, params)
+        if df is None:
+            return None
+        if ttl is None:
+            ttls = [CACHE_TABLE_TTL_SEC[t] for t in tables if t in CACHE_TABLE_TTL_SEC]
+            ttl = min(ttls) if ttls else CACHE_DEFAULT_TTL_SEC
+        query_cache.put(key, df, ttl, tables)
+    return df.copy()
+
+
+def invalidate_cache(table: Optional[str] = None, db_name: Optional[str] = None) -> int:
+    """table(대소문자 무관)/db 에 해당하는 캐시 항목 제거. 둘 다 없으면 전체 제거"""
+    return query_cache.invalidate(table, db_name)
+
+
+def cache_stats() -> dict:
+    return query_cache.stats()
+
+
+BULK_INSERT_MAX_ROWS = 1000     # SQL Server VALUES 절 최대 행 수
+
+
+def bulk_insert(cursor: object, table_name: str, columns: list, rows: list,
+                batch_size: int = 500, literals: Optional[dict] = None) -> int:
+    """
+    다중 VALUES INSERT 로 rows 를 batch_size 행씩 묶어 실행하고 배치마다 1회 커밋 (transaction() 안이면 커밋 생략).
+    rows 는 columns 순서의 시퀀스 또는 dict 리스트.
+    literals 는 {컬럼: SQL 식} 으로 모든 행에 동일하게 들어갈 값 (예: {"CDATE": "GETDATE()"}).
+    반환값: INSERT 된 행 수
+    """
+    if not columns:
+        raise ValueError("INSERT 할 컬럼이 없습니다.")
+    if not rows:
+        return 0
+
+    literals = literals or {}
+    batch_size = max(1, min(batch_size, BULK_INSERT_MAX_ROWS))
+    all_columns = list(columns) + list(literals.keys())
+    row_sql = "(" + ", ".join(["%s"] * len(columns) + list(literals.values())) + ")"
+    head = f"INSERT INTO {table_name} ({', '.join(all_columns)}) VALUES "
+
+    t0 = time.perf_counter()
+    inserted = 0
+    try:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            params = []
+            for r in batch:
+                if isinstance(r, dict):
+                    params.extend(r[c] for c in columns)
+                else:
+                    params.extend(r)
+            cursor.execute(head + ", ".join([row_sql] * len(batch)), tuple(params))
+            _autocommit(cursor)
+            inserted += len(batch)
+    except pymssql.DatabaseError as db_err:
+        print(f"[DB ERROR] bulk_insert {table_name}: {db_err}")
+        print(traceback.format_exc())
+        raise
+
+    dt = time.perf_counter() - t0
+    trace("db", "bulk_insert", table=table_name, rows=inserted, ms=round(dt * 1000, 1),
+          rows_per_sec=round(inserted / dt) if dt > 0 else inserted)
+    return inserted
+
+
 def insert_record(cursor: object, table_name: str, data: dict):
     if not data:
         raise ValueError("빈 데이터는 INSERT할 수 없습니다.")
@@ -148,7 +807,7 @@ def insert_record(cursor: object, table_name: str, data: dict):
     """
     cursor.execute(query, values)
     row = cursor.fetchone()
-    cursor.connection.commit()
+    _autocommit(cursor)
 
     return row[0] if row else None
 
@@ -0,0 +1,100 @@
+# index_advisor.py
+# 대시보드 쿼리용 권장(커버링) 인덱스 출력
+#   python -m UTIL.index_advisor            → CREATE INDEX 문 출력
+#   python -m UTIL.index_advisor --check    → 각 DB 에 이미 있는 인덱스와 비교 (접속 필요)
+#
+# 날짜 조건이 범위(col >= d AND col < d+1)로 바뀌었으므로 날짜 컬럼을 키 앞쪽에 둔다.
+# 실제 생성은 DBA 확인 후 수동으로.
+
+import sys
+
+from UTIL.db_handler import db_connection, runquery
+
+# (DB, 테이블, 키 컬럼, INCLUDE 컬럼, 사용처)
+RECOMMENDED = [
+    ("GP", "ORDER_DASHBOARD", ["sdate", "co"],
+     ["rname", "uname", "pkg", "order_qty", "order_qty_after", "prev_residue",
+      "production_plan", "produced_qty", "today_residue", "work_status", "hide", "recent_chulgo"],
+     "order.by_date / update_qty_after_bulk / update_produced, load_product_tab"),
+    ("GP", "ORDER_DASHBOARD", ["co", "PK"], ["today_residue"],
+     "order.last_today_residue"),
+    ("GP", "DASHBOARD_RAW", ["sdate", "co", "uname"],
+     ["stock", "order_qty", "order_qty_after", "prepro_qty", "ipgo_qty"],
+     "dashboard_raw.by_date / keys_by_date / merge_rows / apply_rows"),
+    ("GP", "DASHBOARD_SAUCE", ["sdate", "co", "uname"],
+     ["stock", "order_qty", "order_qty_after", "prepro_qty", "ipgo_qty"],
+     "dashboard_sauce.by_date / keys_by_date / merge_rows / apply_rows"),
+    ("GP", "DASHBOARD_VEGE", ["sdate", "co", "uname"],
+     ["stock", "order_qty", "order_qty_after", "prepro_qty", "ipgo_qty"],
+     "dashboard_vege.by_date / keys_by_date / merge_rows / apply_rows"),
+    ("GP", "DASHBOARD_LOGS", ["sdate", "modified_time"], ["user_id", "uname", "content", "bigo"],
+     "DashboardLogDialog.load_logs"),
+    ("GWCHUL", "PAN", ["CO", "PDATE"], ["PAN", "DE"],
+     "homeplus.sum_pan_by_co_date"),
+    ("GFOOD_B", "PAN", ["CO", "PDATE"], ["PAN", "IPGO", "CH", "CH2", "JNAME", "JUM", "DE", "CDATE"],
+     "pan.produced / pan.stock_by_cos / _generate_lot"),
+    ("GFOOD_B", "MPAN", ["CO", "SDATE"], ["PANKG", "JNO", "DE"],
+     "mpan.sum_pankg_by_co_date"),
+    ("GFOOD_B", "MPAN", ["JNO", "CO"], ["PANKG", "DE"],
+     "lotte.sum_pankg_by_co (MJEN 서브쿼리 JNO IN)"),
+    ("GFOOD_B", "MJEN", ["SDATE"], ["JNO", "rname", "JBIGO", "DE"],
+     "lotte.sum_pankg_by_co"),
+    ("GFOOD_B", "jen", ["jdate"], ["tco", "tuname", "jnod", "jno", "lot"],
+     "on_click_sync_diary"),
+    ("GWCHUL", "COSONC", ["LCODE", "LDATE"], ["FINAL_QTY"],
+     "coson.final_qty_by_lcode_date"),
+    ("GWCHUL", "COS_B", ["C06"], ["C29", "C17"],
+     "costco.sum_pack_by_co_date (C29 REPLACE 조건은 잔여 필터)"),
+]
+
+
+def index_name(table: str, keys: list) -> str:
+    return f"IX_{table.upper()}_{'_'.join(k.upper() for k in keys)}"
+
+
+def create_sql(table: str, keys: list, include: list) -> str:
+    sql = f"CREATE NONCLUSTERED INDEX {index_name(table, keys)} ON {table} ({', '.join(keys)})"
+    if include:
+        sql += f" INCLUDE ({', '.join(include)})"
+    return sql + ";"
+
+
+def existing_index_keys(db_name: str, table: str) -> list:
+    """[(인덱스명, [키 컬럼...])] — 키 컬럼 순서대로"""
+    sql = """
+        SELECT i.name AS index_name, c.name AS column_name
+        FROM sys.indexes i
+        JOIN sys.index_columns ic ON ic.object_id = i.object_id AND ic.index_id = i.index_id
+        JOIN sys.columns c ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+        WHERE i.object_id = OBJECT_ID(%s)
+          AND ic.is_included_column = 0
+        ORDER BY i.name, ic.key_ordinal
+    """
+    with db_connection(db_name) as (conn, cur):
+        df = runquery(cur, sql, [table])
+    if df is None or df.empty:
+        return []
+    return [(name, [str(c).upper() for c in grp["column_name"]])
+            for name, grp in df.groupby("index_name", sort=False)]
+
+
+def main(check: bool = False) -> None:
+    for db_name, table, keys, include, used_by in RECOMMENDED:
+        print(f"-- [{db_name}] {used_by}")
+        status = ""
+        if check:
+            try:
+                want = [k.upper() for k in keys]
+                found = [name for name, cols in existing_index_keys(db_name, table)
+                         if cols[:len(want)] == want]
+                status = f"-- 이미 있음: {', '.join(found)}" if found else "-- 없음"
+            except Exception as e:
+                status = f"-- 확인 실패: {e}"
+        if status:
+            print(status)
+        print(create_sql(table, keys, include))
+        print()
+
+
+if __name__ == "__main__":
+    main(check="--check" in sys.argv[1:])
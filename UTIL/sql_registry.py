@@ -0,0 +1,533 @@
+import re
+import threading
+import time
+import traceback
+from typing import Optional
+
+import pandas as pd
+import pymssql
+
+from UTIL.db_handler import (
+    CACHE_DEFAULT_TTL_SEC, CACHE_TABLE_TTL_SEC, _autocommit, _tables_of, _to_frame,
+    db_connection, query_cache,
+)
+
+# ======================================================
+# 이름 붙은 파라미터 SQL 레지스트리
+# ------------------------------------------------------
+# pymssql 은 %s 값을 SQL 문자열에 직접 치환해서 보내므로 값이 바뀔 때마다
+# 서버 입장에서는 다른 쿼리 → 플랜 재컴파일. 여기 등록된 문장은
+# sp_executesql 로 실행해 SQL 본문/파라미터 선언이 항상 같게 유지되고,
+# IN (...) 목록은 고정 버킷 크기(8/32/128...)로 패딩해 본문 모양을 고정한다.
+# (VALUES @rows) 행 목록도 같은 버킷으로 패딩 (NULL 행 → 조인되지 않음).
+# ======================================================
+IN_LIST_BUCKETS = (8, 32, 128, 512, 1024)
+VALUES_MAX_PARAMS = 2080    # sp_executesql 파라미터 한도 2100 에서 스칼라 파라미터 몫을 뺀 VALUES 상한
+MATERIAL_TABLES = ("DASHBOARD_RAW", "DASHBOARD_SAUCE", "DASHBOARD_VEGE")
+ORDER_EDIT_FIELDS = ("production_plan", "today_residue", "prev_residue")
+
+
+class Statement:
+    """
+    sql 의 @이름 파라미터는 types 에 SQL 타입을 선언.
+    lists 에 포함된 파라미터는 'IN (@이름)' 형태로 쓰고 리스트 값을 받는다.
+    rows 는 {이름: (열 타입, ...)} — '(VALUES @이름) v(열, ...)' 형태로 쓰고 튜플 목록을 받는다.
+    """
+
+    def __init__(self, name: str, sql: str, types: dict, lists: tuple = (), rows: Optional[dict] = None):
+        self.name = name
+        self.sql = sql
+        self.types = types
+        self.lists = lists
+        self.rows = rows or {}
+        for p in list(types) + list(self.rows):
+            if not re.search(rf"@{p}\b", sql):
+                raise ValueError(f"[{name}] 선언된 파라미터 @{p} 가 SQL 에 없습니다.")
+
+
+STATEMENTS = {}
+_stats = {}                 # {name: {"count", "total_sec", "max_sec"}}
+_stats_lock = threading.Lock()
+
+
+def register(name: str, sql: str, types: Optional[dict] = None, lists: tuple = (),
+             rows: Optional[dict] = None) -> Statement:
+    stmt = Statement(name, sql, types or {}, lists, rows)
+    STATEMENTS[name] = stmt
+    return stmt
+
+
+def _bucket_size(n: int) -> int:
+    for size in IN_LIST_BUCKETS:
+        if n <= size:
+            return size
+    return n
+
+
+def rows_chunk_size(name: str) -> int:
+    """
+    VALUES 행 목록 한 번에 보낼 최대 행 수 — 버킷 크기 중 (행 수 × 열 수) 가
+    VALUES_MAX_PARAMS 안에 드는 가장 큰 값
+    """
+    ncols = sum(len(cols) for cols in STATEMENTS[name].rows.values()) or 1
+    fits = [size for size in IN_LIST_BUCKETS if size * ncols <= VALUES_MAX_PARAMS]
+    return fits[-1] if fits else 1
+
+
+def on_date(column: str, param: str = "sdate") -> str:
+    """CONVERT(DATE, col) = @param 대신 쓰는 범위 조건 (DATEADD 는 파라미터 쪽에만)"""
+    return f"{column} >= @{param} AND {column} < DATEADD(DAY, 1, @{param})"
+
+
+def on_dates(column: str, param: str = "dates") -> str:
+    """
+    CONVERT(DATE, col) IN (@param) 용. 최소~최대 날짜 범위로 seek 한 뒤
+    IN 은 잔여 필터로만 쓴다. @param_from / @param_to 는 render 가 목록에서 채움.
+    """
+    return (f"{column} >= @{param}_from AND {column} < DATEADD(DAY, 1, @{param}_to) "
+            f"AND CONVERT(DATE, {column}) IN (@{param})")
+
+
+def _fill_date_bounds(stmt: Statement, params: dict) -> dict:
+    params = dict(params)
+    for pname in stmt.lists:
+        lo, hi = f"{pname}_from", f"{pname}_to"
+        if lo in stmt.types and lo not in params:
+            items = sorted(str(v)[:10] for v in params.get(pname, ()) if v is not None)
+            params[lo] = items[0] if items else None
+            params[hi] = items[-1] if items else None
+    return params
+
+
+def render(name: str, params: dict) -> tuple:
+    """등록된 문장을 sp_executesql 호출문과 pymssql 파라미터 튜플로 변환"""
+    stmt = STATEMENTS[name]
+    sql = stmt.sql
+    params = _fill_date_bounds(stmt, params)
+    decls, assigns, values = [], [], []
+
+    for pname, ptype in stmt.types.items():
+        if pname not in params:
+            raise KeyError(f"[{name}] 파라미터 누락: {pname}")
+        val = params[pname]
+
+        if pname in stmt.lists:
+            items = list(val)
+            size = _bucket_size(len(items))
+            # 마지막 값을 반복해서 채움 (IN 결과에는 영향 없음). 빈 목록은 NULL → 매칭 없음
+            items += [items[-1] if items else None] * (size - len(items))
+            names = [f"@{pname}_{i}" for i in range(size)]
+            sql = re.sub(rf"@{pname}\b", ", ".join(names), sql)
+            for n, v in zip(names, items):
+                decls.append(f"{n} {ptype}")
+                assigns.append(f"{n} = %s")
+                values.append(v)
+        else:
+            decls.append(f"@{pname} {ptype}")
+            assigns.append(f"@{pname} = %s")
+            values.append(val)
+
+    for pname, col_types in stmt.rows.items():
+        if pname not in params:
+            raise KeyError(f"[{name}] 파라미터 누락: {pname}")
+        items = [tuple(r) for r in params[pname]]
+        size = _bucket_size(len(items))
+        items += [(None,) * len(col_types)] * (size - len(items))
+        tuples = []
+        for i, row in enumerate(items):
+            names = [f"@{pname}_{i}_{j}" for j in range(len(col_types))]
+            tuples.append(f"({', '.join(names)})")
+            for n, ctype, v in zip(names, col_types, row):
+                decls.append(f"{n} {ctype}")
+                assigns.append(f"{n} = %s")
+                values.append(v)
+        sql = re.sub(rf"@{pname}\b", ", ".join(tuples), sql)
+
+    body = " ".join(sql.split()).replace("'", "''").replace("%", "%%")
+    exec_sql = f"EXEC sp_executesql N'{body}'"
+    if decls:
+        exec_sql += f", N'{', '.join(decls)}', " + ", ".join(assigns)
+    return exec_sql, tuple(values)
+
+
+def run_statement(cursor: object, name: str, **params) -> Optional[pd.DataFrame]:
+    """
+    등록된 문장 실행. 결과셋이 있으면 DataFrame(없으면 빈 DataFrame), 없으면 커밋 후 None.
+    (transaction() 안이면 커밋 생략 — runquery 와 동일)
+    """
+    exec_sql, values = render(name, params)
+
+    t0 = time.perf_counter()
+    try:
+        cursor.execute(exec_sql, values)
+        if cursor.description is not None:
+            rows = cursor.fetchall()
+            df = _to_frame(cursor, STATEMENTS[name].sql, rows) if rows else pd.DataFrame()
+        else:
+            _autocommit(cursor)
+            df = None
+    except pymssql.DatabaseError as db_err:
+        print(f"[DB ERROR] [{name}] {db_err}")
+        print(traceback.format_exc())
+        raise
+    finally:
+        _record(name, time.perf_counter() - t0)
+    return df
+
+
+def cached_statement(db_name: str, name: str, ttl: Optional[float] = None,
+                     cursor: object = None, **params) -> Optional[pd.DataFrame]:
+    """
+    run_statement + db_handler.query_cache. 키는 (db, 문장 이름, 파라미터), TTL 규칙은 cached_query 와 같다.
+    반환 DataFrame 은 사본.
+    """
+    tables = _tables_of(STATEMENTS[name].sql)
+    key = (db_name, f"stmt:{name}",
+           tuple((k, tuple(v) if isinstance(v, (list, tuple, set)) else v) for k, v in sorted(params.items())))
+
+    df = query_cache.get(key)
+    if df is None:
+        if cursor is not None:
+            df = run_statement(cursor, name, **params)
+        else:
+            with db_connection(db_name) as (conn, cur):
+                df = run_statement(cur, name, **params)
+        if df is None:
+            return None
+        if ttl is None:
+            ttls = [CACHE_TABLE_TTL_SEC[t] for t in tables if t in CACHE_TABLE_TTL_SEC]
+            ttl = min(ttls) if ttls else CACHE_DEFAULT_TTL_SEC
+        query_cache.put(key, df, ttl, tables)
+    return df.copy()
+
+
+def _record(name: str, dt: float) -> None:
+    with _stats_lock:
+        st = _stats.setdefault(name, {"count": 0, "total_sec": 0.0, "max_sec": 0.0})
+        st["count"] += 1
+        st["total_sec"] += dt
+        st["max_sec"] = max(st["max_sec"], dt)
+
+
+def statement_stats() -> dict:
+    """{name: {count, total_sec, avg_sec, max_sec}}"""
+    with _stats_lock:
+        return {
+            name: dict(st, avg_sec=st["total_sec"] / st["count"] if st["count"] else 0.0)
+            for name, st in _stats.items()
+        }
+
+
+def print_statement_stats() -> None:
+    for name, st in sorted(statement_stats().items(), key=lambda kv: -kv[1]["total_sec"]):
+        print(f"[SQL] {name:<40} {st['count']:>6}회  합계 {st['total_sec']:.3f} s  "
+              f"평균 {st['avg_sec'] * 1000:.1f} ms  최대 {st['max_sec'] * 1000:.1f} ms")
+
+
+def reset_statement_stats() -> None:
+    with _stats_lock:
+        _stats.clear()
+
+
+# ======================================================
+# 대시보드 문장 등록
+# ======================================================
+CO = "VARCHAR(50)"
+DATES = {"dates": "DATE", "dates_from": "DATE", "dates_to": "DATE"}   # on_dates() 용
+
+# ---------- ORDER_DASHBOARD (GP) ----------
+register("order.by_date", f"""
+    SELECT co, order_qty_after, production_plan, prev_residue, pkg
+    FROM ORDER_DASHBOARD
+    WHERE {on_date('sdate')}
+""", {"sdate": "DATE"})
+
+register("order.distinct_co_by_date", f"""
+    SELECT DISTINCT co FROM ORDER_DASHBOARD WHERE {on_date('sdate')}
+""", {"sdate": "DATE"})
+
+# 발주량 일괄 반영: 품목별 UPDATE N번 대신 (co, qty) 행 목록과 조인한 UPDATE 1번
+register("order.update_qty_after_bulk", f"""
+    UPDATE O
+    SET order_qty_after = v.qty
+    FROM ORDER_DASHBOARD O
+    JOIN (VALUES @rows) v(co, qty) ON O.co = v.co
+    WHERE {on_date('O.sdate')}
+""", {"sdate": "DATE"}, rows={"rows": (CO, "INT")})
+
+register("order.update_produced", f"""
+    UPDATE ORDER_DASHBOARD
+    SET produced_qty = @qty, recent_chulgo = @recent
+    WHERE {on_date('sdate')} AND co = @co
+""", {"qty": "INT", "recent": "DATETIME", "sdate": "DATE", "co": CO})
+
+register("order.row_by_pk", """
+    SELECT
+        PK, co, rname, uname, pkg,
+        order_qty, order_qty_after,
+        prev_residue, production_plan, produced_qty,
+        today_residue, recent_chulgo
+    FROM ORDER_DASHBOARD
+    WHERE PK = @pk
+""", {"pk": "INT"})
+
+register("order.last_today_residue", """
+    SELECT TOP 1 today_residue
+    FROM ORDER_DASHBOARD
+    WHERE co = @co
+    ORDER BY PK DESC
+""", {"co": CO})
+
+register("order.sum_qty_after_by_co", f"""
+    SELECT ISNULL(SUM(order_qty_after), 0) AS qty
+    FROM ORDER_DASHBOARD
+    WHERE {on_date('sdate')}
+      AND co = @co
+""", {"sdate": "DATE", "co": CO})
+
+for _field in ORDER_EDIT_FIELDS:
+    register(f"order.get_{_field}", f"""
+        SELECT {_field} FROM ORDER_DASHBOARD WHERE PK = @pk
+    """, {"pk": "INT"})
+    register(f"order.set_{_field}", f"""
+        UPDATE ORDER_DASHBOARD SET {_field} = @val WHERE PK = @pk
+    """, {"val": "INT", "pk": "INT"})
+
+# ---------- DASHBOARD_RAW / SAUCE / VEGE (GP) ----------
+MATERIAL_STAGE = "#material_stage"      # merge_rows 한 번에 못 보내는 행 수일 때 쓰는 임시 테이블
+
+
+def _material_merge_sql(table: str, source: str, partial: bool = False) -> str:
+    """
+    partial=False: source 가 그 날짜 전체 결과 — source 에 없는 행은 DELETE
+    partial=True : source 에 있는 행만 반영 — qty 가 NULL 인 행은 DELETE (단건 증분 반영용)
+    """
+    if partial:
+        tail = """
+        WHEN MATCHED AND S.qty IS NULL THEN
+            DELETE
+        WHEN MATCHED THEN
+            UPDATE SET order_qty_after = S.qty
+        WHEN NOT MATCHED BY TARGET AND S.qty IS NOT NULL THEN"""
+        end = ""
+    else:
+        tail = """
+        WHEN MATCHED THEN
+            UPDATE SET order_qty_after = S.qty
+        WHEN NOT MATCHED BY TARGET THEN"""
+        end = """
+        WHEN NOT MATCHED BY SOURCE THEN
+            DELETE"""
+    return f"""
+        WITH T AS (SELECT * FROM {table} WHERE {on_date('sdate')})
+        MERGE T
+        USING ({source}) AS S
+           ON T.co = S.co AND T.uname = S.uname{tail}
+            INSERT (uname, co, sdate, created_time, stock, order_qty, order_qty_after, prepro_qty, ipgo_qty)
+            VALUES (S.uname, S.co, @sdate, @now, ISNULL(S.stock, 0), S.qty, S.qty, 0, 0){end};
+    """
+
+
+for _tbl in MATERIAL_TABLES:
+    _key = _tbl.lower()
+    register(f"{_key}.by_date", f"""
+        SELECT PK, uname, co, stock, order_qty,
+               order_qty_after, prepro_qty, ipgo_qty
+        FROM {_tbl}
+        WHERE {on_date('sdate')}
+        ORDER BY uname, co, PK
+    """, {"sdate": "DATE"})
+    register(f"{_key}.keys_by_date", f"""
+        SELECT PK, uname, co
+        FROM {_tbl}
+        WHERE {on_date('sdate')}
+    """, {"sdate": "DATE"})
+    register(f"{_key}.row_by_pk", f"""
+        SELECT PK, uname, stock, order_qty, order_qty_after,
+               prepro_qty, ipgo_qty
+        FROM {_tbl}
+        WHERE PK = @pk
+    """, {"pk": "INT"})
+    register(f"{_key}.manual_by_pk", f"""
+        SELECT stock, prepro_qty, ipgo_qty FROM {_tbl} WHERE PK = @pk
+    """, {"pk": "INT"})
+    register(f"{_key}.set_manual", f"""
+        UPDATE {_tbl}
+        SET stock = @stock, prepro_qty = @prepro, ipgo_qty = @ipgo
+        WHERE PK = @pk
+    """, {"stock": "INT", "prepro": "INT", "ipgo": "INT", "pk": "INT"})
+    register(f"{_key}.delete_by_date", f"""
+        DELETE FROM {_tbl} WHERE {on_date('sdate')}
+    """, {"sdate": "DATE"})
+    # 계산 결과 (co, uname, qty, stock) 를 한 번에 반영 — 있으면 order_qty_after 만,
+    # 없으면 INSERT (stock 은 새 행에만 사용), 결과에 없는 그 날짜 행은 DELETE.
+    # 수기 입력 stock / prepro_qty / ipgo_qty 는 기존 행에서 건드리지 않는다.
+    register(f"{_key}.merge_rows", _material_merge_sql(
+        _tbl, "SELECT co, uname, qty, stock FROM (VALUES @rows) v(co, uname, qty, stock) WHERE co IS NOT NULL",
+    ), {"sdate": "DATE", "now": "DATETIME"}, rows={"rows": (CO, "NVARCHAR(200)", "INT", "INT")})
+    register(f"{_key}.merge_stage", _material_merge_sql(
+        _tbl, f"SELECT co, uname, qty, stock FROM {MATERIAL_STAGE}",
+    ), {"sdate": "DATE", "now": "DATETIME"})
+    # 생산계획 단건 수정의 증분 반영 — 영향받는 (co, uname) 행만 (qty NULL = 삭제)
+    register(f"{_key}.apply_rows", _material_merge_sql(
+        _tbl, "SELECT co, uname, qty, stock FROM (VALUES @rows) v(co, uname, qty, stock) WHERE co IS NOT NULL",
+        partial=True,
+    ), {"sdate": "DATE", "now": "DATETIME"}, rows={"rows": (CO, "NVARCHAR(200)", "INT", "INT")})
+
+# ---------- 업체별 발주량 (GWCHUL / GFOOD_B) ----------
+# 롯데 양념육: 조회일 목록의 MJEN JNO 집합에 속한 MPAN 을 CO 별로 합산 (JNO 목록은 서버 안에서만 사용)
+#   전표가 여러 날짜에 걸쳐도 MPAN 행은 한 번만 — 조회일 목록(입고일별 규칙 결과)마다 따로 조회한다
+register("lotte.sum_pankg_by_co", f"""
+    SELECT P.CO, ISNULL(SUM(P.PANKG), 0) AS sum_pan
+    FROM MPAN P
+    WHERE P.DE = 'N'
+      AND P.JNO IN (
+          SELECT JNO
+          FROM MJEN
+          WHERE rname LIKE '%롯데%'
+            AND JBIGO = '양념육'
+            AND {on_dates('SDATE')}
+            AND DE = 'N'
+      )
+    GROUP BY P.CO
+""", DATES, lists=("dates",))
+
+# ---------- 레시피 (GFOOD_B, logic.material_bom) ----------
+# 자재 구분(키워드/BCO)은 logic.material_bom.RecipeIndex 가 메모리에서 — 서버에서는 CO 로만 찾는다
+register("recipe.by_cos", """
+    SELECT R.CO, R.BCO, R.BUNAME, R.SA
+    FROM RECIPE R
+    WHERE R.CO IN (@cos)
+""", {"cos": CO}, lists=("cos",))
+
+# ---------- 생산량 / 재고 (GFOOD_B) ----------
+register("pan.produced", f"""
+    SELECT ISNULL(SUM(PAN),0) AS sum_pan, MAX(CDATE) as max_time
+    FROM PAN
+    WHERE CH = 'C'
+      AND JNAME = '공장(양념육)'
+      AND CO = @co
+      AND {on_date('PDATE')}
+""", {"co": CO, "sdate": "DATE"})
+
+# 지점(JNAME)별 재고 중 양수만 합산 — BCO 목록을 한 번에 (logic.cal_values.get_stock_batch)
+register("pan.stock_by_cos", """
+    SELECT S.CO, SUM(CASE WHEN S.stock_box > 0 THEN S.stock_box ELSE 0 END) AS stock
+    FROM (
+        SELECT A.CO, A.JNAME, SUM(A.IPGO) - SUM(A.PAN) AS stock_box
+        FROM PAN A
+        WHERE A.CH <> 'M'
+          AND A.CO IN (@cos)
+          AND A.PDATE <= CONVERT(smalldatetime, @sdate)
+          AND A.JNAME <> ''
+          AND A.JUM = '지점'
+          AND A.DE = 'N'
+        GROUP BY A.CO, A.JNAME
+    ) S
+    GROUP BY S.CO
+""", {"cos": CO, "sdate": "DATE"}, lists=("cos",))
+
+# ---------- 일괄 발주량 (calc_order_qty_packs_batch) ----------
+# GFOOD_B.MASTER 품목 정보 + MMASTER TCO (logic.master_data)
+register("master.info_by_cos", """
+    SELECT M.CO, M.UNAME, M.PACSU, M.PACKG, MM.TCO
+    FROM MASTER M
+    OUTER APPLY (SELECT TOP 1 TCO FROM MMASTER WHERE CO = M.CO) MM
+    WHERE M.CO IN (@cos)
+""", {"cos": CO}, lists=("cos",))
+
+# 발주 원천 (logic/vendor_rules.json 의 sources) — (키, 날짜, 값) 형태로 돌려주므로
+# 같은 원천을 쓰는 업체/조회일이 달라도 한 번에 조회하고 평가 단계에서 골라 쓴다
+register("homeplus.sum_pan_by_co_date", f"""
+    SELECT CO, CONVERT(DATE, PDATE) AS pdate, ISNULL(SUM(PAN), 0) AS sum_pan
+    FROM PAN
+    WHERE CO IN (@cos)
+      AND {on_dates('PDATE')}
+      AND DE = 'N'
+    GROUP BY CO, CONVERT(DATE, PDATE)
+""", {"cos": CO, **DATES}, lists=("cos", "dates"))
+
+register("mpan.sum_pankg_by_co_date", f"""
+    SELECT CO, CONVERT(DATE, SDATE) AS sdate, ISNULL(SUM(PANKG), 0) AS sum_pan
+    FROM MPAN
+    WHERE CO IN (@cos)
+      AND {on_dates('SDATE')}
+      AND DE = 'N'
+    GROUP BY CO, CONVERT(DATE, SDATE)
+""", {"cos": CO, **DATES}, lists=("cos", "dates"))
+
+# 단건 TOP 1 (순서 없음) 대신 LCODE·날짜별 MAX 로 결정적으로
+register("coson.final_qty_by_lcode_date", f"""
+    SELECT LCODE, CONVERT(DATE, LDATE) AS ldate, MAX(FINAL_QTY) AS final_qty
+    FROM COSONC
+    WHERE LCODE IN (@lcodes)
+      AND {on_dates('LDATE')}
+    GROUP BY LCODE, CONVERT(DATE, LDATE)
+""", {"lcodes": CO, **DATES}, lists=("lcodes", "dates"))
+
+# C06 날짜 범위로 seek, 공백 제거한 C29 비교는 범위 안에서만 하는 잔여 필터
+register("costco.sum_pack_by_co_date", f"""
+    SELECT co, CONVERT(DATE, C06) AS c06, ISNULL(SUM(CONVERT(int, C17)), 0) AS sum_pack
+    FROM (
+        SELECT REPLACE(RTRIM(LTRIM(C29)), ' ', '') AS co, C06, C17
+        FROM COS_B
+        WHERE {on_dates('C06')}
+    ) t
+    WHERE co IN (@cos)
+    GROUP BY co, CONVERT(DATE, C06)
+""", {"cos": CO, **DATES}, lists=("cos", "dates"))
+
+# ---------- 발주 원천 변경 감지 (logic.order_prefetch.refresh) ----------
+# 원천 키·날짜별 (행 수, CHECKSUM_AGG) — 발주량 합계에 쓰는 행/컬럼과 같은 조건이라
+# 값이 같으면 그 키·날짜의 합계도 같다 (키별로 비교해서 움직인 품목만 다시 계산). 원천 테이블에 공통 CDATE 가 없어 MAX(CDATE) 는 쓰지 않는다.
+register("homeplus.watermark_by_date", f"""
+    SELECT CO, CONVERT(DATE, PDATE) AS d, COUNT_BIG(*) AS cnt, CHECKSUM_AGG(BINARY_CHECKSUM(PAN)) AS chk
+    FROM PAN
+    WHERE CO IN (@cos)
+      AND {on_dates('PDATE')}
+      AND DE = 'N'
+    GROUP BY CO, CONVERT(DATE, PDATE)
+""", {"cos": CO, **DATES}, lists=("cos", "dates"))
+
+register("mpan.watermark_by_date", f"""
+    SELECT CO, CONVERT(DATE, SDATE) AS d, COUNT_BIG(*) AS cnt, CHECKSUM_AGG(BINARY_CHECKSUM(PANKG)) AS chk
+    FROM MPAN
+    WHERE CO IN (@cos)
+      AND {on_dates('SDATE')}
+      AND DE = 'N'
+    GROUP BY CO, CONVERT(DATE, SDATE)
+""", {"cos": CO, **DATES}, lists=("cos", "dates"))
+
+register("lotte.watermark_by_date", f"""
+    SELECT P.CO, J.sdate AS d, COUNT_BIG(*) AS cnt, CHECKSUM_AGG(BINARY_CHECKSUM(P.PANKG)) AS chk
+    FROM MPAN P
+    JOIN (
+        SELECT DISTINCT JNO, CONVERT(DATE, SDATE) AS sdate
+        FROM MJEN
+        WHERE rname LIKE '%롯데%'
+          AND JBIGO = '양념육'
+          AND {on_dates('SDATE')}
+          AND DE = 'N'
+    ) J ON J.JNO = P.JNO
+    WHERE P.DE = 'N'
+    GROUP BY P.CO, J.sdate
+""", DATES, lists=("dates",))
+
+register("coson.watermark_by_date", f"""
+    SELECT LCODE, CONVERT(DATE, LDATE) AS d, COUNT_BIG(*) AS cnt, CHECKSUM_AGG(BINARY_CHECKSUM(FINAL_QTY)) AS chk
+    FROM COSONC
+    WHERE LCODE IN (@lcodes)
+      AND {on_dates('LDATE')}
+    GROUP BY LCODE, CONVERT(DATE, LDATE)
+""", {"lcodes": CO, **DATES}, lists=("lcodes", "dates"))
+
+register("costco.watermark_by_date", f"""
+    SELECT co, CONVERT(DATE, C06) AS d, COUNT_BIG(*) AS cnt, CHECKSUM_AGG(BINARY_CHECKSUM(C17)) AS chk
+    FROM (
+        SELECT REPLACE(RTRIM(LTRIM(C29)), ' ', '') AS co, C06, C17
+        FROM COS_B
+        WHERE {on_dates('C06')}
+    ) t
+    WHERE co IN (@cos)
+    GROUP BY co, CONVERT(DATE, C06)
+""", {"cos": CO, **DATES}, lists=("cos", "dates"))
@@ -1,3 +1,8 @@
+import os
+import time
+from collections import deque
+
+
 def fmt(val) -> str:
     """
     숫자(int/float/str) → '1,234' 형식으로 포맷
@@ -31,4 +36,46 @@ def fmt(val) -> str:
 
     except:
         # 숫자로 볼 수 없는 경우 → 그대로 텍스트 반환
-        return str(val)
\ No newline at end of file
+        return str(val)
+
+
+# -----------------------------------------------------
+# 구조화 진단 로그 (채널별 on/off)
+#   enable_trace("order")            → 이벤트 수집
+#   enable_trace("order", echo=True) → 수집 + 콘솔 출력
+#   환경변수 DASHBOARD_TRACE=order,prefetch 로 시작 시 켜기
+# 꺼진 채널의 trace() 호출은 바로 반환 (출력/문자열 생성 없음)
+# -----------------------------------------------------
+TRACE_MAX_EVENTS = 5000
+
+_trace_channels = {c.strip(): False for c in os.environ.get("DASHBOARD_TRACE", "").split(",") if c.strip()}
+_trace_events = deque(maxlen=TRACE_MAX_EVENTS)
+
+
+def enable_trace(channel: str, on: bool = True, echo: bool = False) -> None:
+    if on:
+        _trace_channels[channel] = echo
+    else:
+        _trace_channels.pop(channel, None)
+
+
+def trace_enabled(channel: str) -> bool:
+    return channel in _trace_channels
+
+
+def trace(channel: str, event: str, **fields) -> None:
+    if channel not in _trace_channels:
+        return
+    record = {"ts": time.time(), "channel": channel, "event": event, **fields}
+    _trace_events.append(record)
+    if _trace_channels[channel]:
+        detail = " ".join(f"{k}={v}" for k, v in fields.items())
+        print(f"[TRACE:{channel}] {event} {detail}")
+
+
+def trace_events(channel: str = None) -> list:
+    return [e for e in _trace_events if channel is None or e["channel"] == channel]
+
+
+def clear_trace() -> None:
+    _trace_events.clear()
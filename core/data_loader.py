@@ -14,7 +14,8 @@ from UTIL.const import (
     COL_PRODUCTION, COL_PLAN, COL_PLAN_KG, COL_CUR_PROD,
     COL_SHIPMENT_TIME, COL_TODAY_RES, COL_TRATE, COL_WORK_STATUS,
 )
-from UTIL.db_handler import runquery, db_connection
+from UTIL.db_handler import runquery, db_connection, next_day
+from UTIL.sql_registry import run_statement
 from UTIL.util import fmt
 from logic.cal_values import calc_trate_value
 
@@ -51,9 +52,9 @@ class DataLoader:
                     LEFT JOIN Dashboard_UNAME_MAP B
                            ON A.uname = B.before_value
                           AND A.rname = B.retailer
-                    WHERE CONVERT(DATE, A.sdate) = %s
+                    WHERE A.sdate >= %s AND A.sdate < %s
                 """
-                params = [sdate_str]
+                params = [sdate_str, next_day(sdate_str)]
 
                 if not w.show_hidden:
                     sql += " AND (A.hide = 0 OR A.hide IS NULL)"
@@ -245,14 +246,7 @@ class DataLoader:
 
         try:
             with db_connection(DB_NAME) as (conn, cur):
-                sql = f"""
-                    SELECT PK, uname, co, stock, order_qty,
-                           order_qty_after, prepro_qty, ipgo_qty
-                    FROM {db_table}
-                    WHERE CONVERT(DATE, sdate) = %s
-                    ORDER BY uname, co, PK
-                """
-                df = runquery(cur, sql, [sdate_str])
+                df = run_statement(cur, f"{db_table.lower()}.by_date", sdate=sdate_str)
         except (ConnectionError, Exception) as e:
             print(f"[_load_material_tab] DB 연결 실패: {e}")
             table.blockSignals(False)
@@ -308,16 +302,7 @@ class DataLoader:
         sdate_str = qdate.toString("yyyy-MM-dd")
 
         with db_connection(DB_NAME) as (conn, cur):
-            sql = """
-                SELECT
-                    PK, co, rname, uname, pkg,
-                    order_qty, order_qty_after,
-                    prev_residue, production_plan, produced_qty,
-                    today_residue, recent_chulgo
-                FROM ORDER_DASHBOARD
-                WHERE PK = %s
-            """
-            df = runquery(cur, sql, [pk])
+            df = run_statement(cur, "order.row_by_pk", pk=pk)
 
         if df is None or len(df) == 0:
             return
@@ -405,13 +390,7 @@ class DataLoader:
         db_table = w._material_db_table(tab_key)
 
         with db_connection(DB_NAME) as (conn, cur):
-            sql = f"""
-                SELECT PK, uname, stock, order_qty, order_qty_after,
-                       prepro_qty, ipgo_qty
-                FROM {db_table}
-                WHERE PK = %s
-            """
-            df = runquery(cur, sql, [pk])
+            df = run_statement(cur, f"{db_table.lower()}.row_by_pk", pk=pk)
 
         if df is None or df.empty:
             return
@@ -25,19 +25,21 @@ from UTIL.const import (
     DB_NAME,
     COL_PRODUCT, COL_PLAN, COL_TODAY_RES, COL_PREV_RES, COL_WORK_STATUS,
 )
-from UTIL.db_handler import getdb, runquery, closedb, db_connection
+from UTIL.db_handler import (
+    getdb, runquery, closedb, db_connection, bulk_insert, transaction, cached_query,
+    date_range,
+)
+from UTIL.sql_registry import rows_chunk_size, run_statement
 from UTIL.util import fmt
 from logic.cal_values import (
-    calc_order_qty_packs,
+    calc_order_qty_packs_batch,
     get_pacsu_by_co,
     get_produced_qty_packs,
-    calc_plan_kg_by_recipe,
-    get_stock_from_pan,
     get_prev_residue_from_today,
-    recalc_dashboard_raw_keep_manual,
-    recalc_dashboard_sauce_keep_manual,
-    recalc_dashboard_vege_keep_manual,
 )
+from logic.master_data import master_index
+from logic.material_bom import generate_materials, recalc_materials_for_co, recalc_materials_keep_manual
+from logic.order_prefetch import order_prefetch
 from dialog.DashboardLogDialog import DashboardLogDialog
 from dialog.ProductListDialog import ProductListDialog
 
@@ -86,15 +88,21 @@ class DataWriter:
         with db_connection(DB_NAME) as (conn, cur):
             # 변경 전 값 조회
             old_val = 0
+            old_read = False
             try:
-                df_old = runquery(cur, f"SELECT {field_name} FROM ORDER_DASHBOARD WHERE PK = %s", [pk])
+                df_old = run_statement(cur, f"order.get_{field_name}", pk=pk)
                 if df_old is not None and not df_old.empty:
                     old_val = int(df_old.iloc[0, 0] or 0)
+                    old_read = True
             except Exception:
                 pass
 
-            sql = f"UPDATE ORDER_DASHBOARD SET {field_name} = %s WHERE PK = %s"
-            runquery(cur, sql, [new_val, pk])
+            run_statement(cur, f"order.set_{field_name}", val=new_val, pk=pk)
+
+            # 생산계획 변경은 원료/소스/야채에 반영할 CO 도 같이 읽어 둔다
+            df_row = None
+            if field_name == "production_plan" and old_read and old_val != new_val:
+                df_row = run_statement(cur, "order.row_by_pk", pk=pk)
 
             # 로그 기록
             if old_val != new_val:
@@ -113,6 +121,17 @@ class DataWriter:
                     w.current_user, w.ui.dateEdit.date(), uname, content, ""
                 )
 
+        # 생산계획: 그 품목의 레시피가 닿는 자재 행만 다시 계산
+        #   (이전 값을 못 읽었으면 바뀌었는지 알 수 없으므로 전체 재계산)
+        try:
+            if field_name == "production_plan" and not old_read:
+                recalc_materials_keep_manual(w.ui.dateEdit.date())
+            elif df_row is not None and not df_row.empty:
+                df_row.columns = [str(c).upper() for c in df_row.columns]
+                recalc_materials_for_co(w.ui.dateEdit.date(), str(df_row.iloc[0]["CO"] or "").strip())
+        except Exception as e:
+            print(f"[on_product_item_changed] 원료/소스/야채 반영 실패: {e}")
+
         w.loader.refresh_single_row(pk)
 
     def on_material_item_changed(self, tab_key: str, item: QTableWidgetItem):
@@ -146,9 +165,7 @@ class DataWriter:
             # 로그용: 변경 전 값 조회
             old_vals = {}
             try:
-                df_old = runquery(
-                    cur, f"SELECT stock, prepro_qty, ipgo_qty FROM {db_table} WHERE PK = %s", [pk]
-                )
+                df_old = run_statement(cur, f"{db_table.lower()}.manual_by_pk", pk=pk)
                 if df_old is not None and not df_old.empty:
                     old_vals["stock"] = int(df_old.iloc[0][0] or 0)
                     old_vals["prepro_qty"] = int(df_old.iloc[0][1] or 0)
@@ -156,12 +173,10 @@ class DataWriter:
             except Exception:
                 pass
 
-            sql = f"""
-                UPDATE {db_table}
-                SET stock = %s, prepro_qty = %s, ipgo_qty = %s
-                WHERE PK = %s
-            """
-            runquery(cur, sql, [stock, prepro, incoming, pk])
+            run_statement(
+                cur, f"{db_table.lower()}.set_manual",
+                stock=stock, prepro=prepro, ipgo=incoming, pk=pk,
+            )
 
             # 로그 기록
             changed_content = []
@@ -185,184 +200,17 @@ class DataWriter:
     # --------------------------------------------------
     # 대시보드 데이터 가공
     # --------------------------------------------------
-    def generate_material_dashboard(self, db_table: str, recipe_keyword: str, bco_list: list):
-        """Raw/Sauce 대시보드 공통 생성 로직"""
-        w = self.w
-        qdate = w.ui.dateEdit.date()
-        sdate_str = qdate.toString("yyyy-MM-dd")
-        sdate_dt = datetime(qdate.year(), qdate.month(), qdate.day(), 0, 0, 0)
-        now = datetime.now()
-
-        with db_connection(DB_NAME) as (conn, cur):
-            sql_order = """
-                SELECT co, order_qty_after, production_plan, prev_residue, pkg
-                FROM ORDER_DASHBOARD
-                WHERE CONVERT(DATE, sdate) = %s
-            """
-            df_order = runquery(cur, sql_order, [sdate_str])
-
-        if df_order is None or df_order.empty:
-            with db_connection(DB_NAME) as (conn, cur):
-                runquery(cur, f"DELETE FROM {db_table} WHERE CONVERT(DATE, sdate) = %s", [sdate_str])
-            return
-
-        df_order.columns = [c.upper() for c in df_order.columns]
-        df_order["CO"] = df_order["CO"].astype(str).str.strip()
-
-        grouped = calc_plan_kg_by_recipe(df_order, recipe_keyword, bco_list)
-
-        if grouped is None or grouped.empty:
-            with db_connection(DB_NAME) as (conn, cur):
-                runquery(cur, f"DELETE FROM {db_table} WHERE CONVERT(DATE, sdate) = %s", [sdate_str])
-            return
-
-        with db_connection(DB_NAME) as (conn, cur):
-            runquery(cur, f"DELETE FROM {db_table} WHERE CONVERT(DATE, sdate) = %s", [sdate_str])
-
-        rows = []
-        for _, r in grouped.iterrows():
-            bco = str(r["BCO"]).strip()
-            buname = str(r["BUNAME"]).strip()
-            plan_kg_sum = float(r["PLAN_KG"] or 0)
-            qty_int = int(round(plan_kg_sum))
-
-            if qty_int <= 0:
-                continue
-
-            stock_val = get_stock_from_pan(bco, sdate_str)
-            rows.append({
-                "uname": buname, "co": bco, "sdate": sdate_dt,
-                "created_time": now, "stock": stock_val,
-                "order_qty": qty_int, "order_qty_after": qty_int,
-                "prepro_qty": 0, "ipgo_qty": 0,
-            })
-
-        if rows:
-            self._insert_material_rows(db_table, rows)
-
-    def dashboard_vege_from_dashboard(self):
-        w = self.w
-        qdate = w.ui.dateEdit.date()
-        sdate_str = qdate.toString("yyyy-MM-dd")
-        sdate_dt = datetime(qdate.year(), qdate.month(), qdate.day(), 0, 0, 0)
-        now = datetime.now()
-
-        VEGE_BCO_LIST = ["720192", "700122", "720094", "710665"]
-
-        with db_connection(DB_NAME) as (conn, cur):
-            sql = """
-                SELECT co, order_qty_after, production_plan, prev_residue, pkg
-                FROM ORDER_DASHBOARD
-                WHERE CONVERT(DATE, sdate) = %s
-            """
-            df_order = runquery(cur, sql, [sdate_str])
-
-        if df_order is None or df_order.empty:
-            with db_connection(DB_NAME) as (conn, cur):
-                runquery(cur, "DELETE FROM DASHBOARD_VEGE WHERE CONVERT(DATE, sdate) = %s", [sdate_str])
-            return
-
-        df_order.columns = [c.upper() for c in df_order.columns]
-        df_order["CO"] = df_order["CO"].astype(str).str.strip()
-
-        co_list = df_order["CO"].unique().tolist()
-        if not co_list:
-            return
-
-        with db_connection("GFOOD_B") as (conn, cur):
-            sql = f"""
-                SELECT CO, BCO, BUNAME, SA
-                FROM RECIPE
-                WHERE BCO IN ({','.join(['%s'] * len(VEGE_BCO_LIST))})
-                  AND CO IN ({','.join(['%s'] * len(co_list))})
-            """
-            df_recipe = runquery(cur, sql, VEGE_BCO_LIST + co_list)
-
-        if df_recipe is None or df_recipe.empty:
-            with db_connection(DB_NAME) as (conn, cur):
-                runquery(cur, "DELETE FROM DASHBOARD_VEGE WHERE CONVERT(DATE, sdate) = %s", [sdate_str])
-            return
-
-        df_recipe.columns = [c.upper() for c in df_recipe.columns]
-        df_recipe["CO"] = df_recipe["CO"].astype(str).str.strip()
-        df_recipe["BCO"] = df_recipe["BCO"].astype(str).str.strip()
-
-        df = df_order.merge(df_recipe, on="CO", how="inner")
-        if df.empty:
-            return
-
-        df["PLAN_KG"] = df["PRODUCTION_PLAN"].fillna(0).astype(float) * df["PKG"].fillna(0).astype(float)
-        df = df[df["PLAN_KG"] > 0]
-        if df.empty:
-            return
-
-        df["VEGE_KG"] = df["PLAN_KG"] * df["SA"].fillna(0).astype(float)
-        df = df[df["VEGE_KG"] > 0]
-        if df.empty:
-            return
-
-        grouped = df.groupby(["BCO", "BUNAME"], as_index=False)["VEGE_KG"].sum()
-
-        with db_connection(DB_NAME) as (conn, cur):
-            runquery(cur, "DELETE FROM DASHBOARD_VEGE WHERE CONVERT(DATE, sdate) = %s", [sdate_str])
-
-        rows = []
-        for _, r in grouped.iterrows():
-            qty_int = int(round(float(r["VEGE_KG"] or 0)))
-            if qty_int <= 0:
-                continue
-
-            stock_val = get_stock_from_pan(str(r["BCO"]), sdate_str)
-            rows.append({
-                "uname": r["BUNAME"], "co": r["BCO"], "sdate": sdate_dt,
-                "created_time": now, "stock": stock_val,
-                "order_qty": qty_int, "order_qty_after": qty_int,
-                "prepro_qty": 0, "ipgo_qty": 0,
-            })
-
-        if rows:
-            self._insert_material_rows("DASHBOARD_VEGE", rows)
-
     # --------------------------------------------------
     # DB Insert/Update/Delete
     # --------------------------------------------------
     def _insert_dashboard_rows(self, rows):
         with db_connection(DB_NAME) as (conn, cur):
-            sql = """
-                INSERT INTO ORDER_DASHBOARD (
-                    bigo, sdate, created_time, id,
-                    rname, uname, co, pkg,
-                    order_qty, order_qty_after, prev_residue, production_plan,
-                    produced_qty, today_residue
-                )
-                VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
-            """
-            for r in rows:
-                params = [
-                    r["bigo"], r["sdate"], r["created_time"], r["id"],
-                    r["rname"], r["uname"], r["co"], r["pkg"],
-                    r["order_qty"], r["order_qty_after"], r["prev_residue"],
-                    r["production_plan"], r["produced_qty"], r["today_residue"],
-                ]
-                runquery(cur, sql, params)
-
-    def _insert_material_rows(self, db_table: str, rows: list):
-        """Raw/Sauce/Vege INSERT 공통"""
-        with db_connection(DB_NAME) as (conn, cur):
-            sql = f"""
-                INSERT INTO {db_table} (
-                    uname, co, sdate, created_time,
-                    stock, order_qty, order_qty_after,
-                    prepro_qty, ipgo_qty
-                )
-                VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s)
-            """
-            for r in rows:
-                runquery(cur, sql, [
-                    r["uname"], r["co"], r["sdate"], r["created_time"],
-                    r["stock"], r["order_qty"], r["order_qty_after"],
-                    r["prepro_qty"], r["ipgo_qty"],
-                ])
+            bulk_insert(cur, "ORDER_DASHBOARD", [
+                "bigo", "sdate", "created_time", "id",
+                "rname", "uname", "co", "pkg",
+                "order_qty", "order_qty_after", "prev_residue", "production_plan",
+                "produced_qty", "today_residue",
+            ], rows)
 
     def on_click_add_dummy_rows(self):
         w = self.w
@@ -383,61 +231,30 @@ class DataWriter:
 
         rows = []
 
-        with db_connection("GFOOD_B") as (conn_master, cur_master):
-            for base_co, vendor in w.product_list:
-                base_co = str(base_co).strip()
-                if not base_co:
-                    continue
-
-                df_master = runquery(
-                    cur_master,
-                    "SELECT TOP 1 CO, UNAME, PACKG, PACSU FROM MASTER WHERE CO = %s",
-                    [base_co],
-                )
-
-                if df_master is None or df_master.empty:
-                    print(f"[SKIP:MASTER NOT FOUND] vendor={vendor}  base_co={base_co}")
-                    continue
-
-                m = df_master.iloc[0]
-                uname = str(m.get("UNAME", "")).strip()
+        products = [(str(co).strip(), vendor) for co, vendor in w.product_list if str(co).strip()]
+        masters = master_index.load([co for co, _ in products])
+        qty_map = order_prefetch.quantities(
+            [(co, vendor) for co, vendor in products if masters.get(co)], sdate_str)
 
-                packg_raw = m.get("PACKG", None)
-                pkg = 0.0
-                if packg_raw is not None:
-                    try:
-                        pkg = float(packg_raw)
-                    except Exception:
-                        try:
-                            pkg = float(str(packg_raw).replace("KG", "").replace("kg", "").strip())
-                        except Exception:
-                            pkg = 0.0
-
-                pacsu_raw = m.get("PACSU", 1)
-                try:
-                    pacsu = int(pacsu_raw if pacsu_raw not in (None, "") else 1)
-                except Exception:
-                    pacsu = 1
-                if pacsu <= 0:
-                    pacsu = 1
-
-                prev_residue = get_prev_residue_from_today(base_co)
-
-                order_qty_packs = calc_order_qty_packs(
-                    base_co=base_co, vendor=vendor,
-                    sdate_str=sdate_str, pacsu=pacsu,
-                )
+        for base_co, vendor in products:
+            m = masters.get(base_co)
+            if m is None:
+                print(f"[SKIP:MASTER NOT FOUND] vendor={vendor}  base_co={base_co}")
+                continue
 
-                produced_qty_val, produced_time = get_produced_qty_packs(base_co, sdate_str, pacsu)
+            pacsu = m["PACSU"]
+            prev_residue = get_prev_residue_from_today(base_co)
+            order_qty_packs = qty_map.get(base_co, 0)
+            produced_qty_val, produced_time = get_produced_qty_packs(base_co, sdate_str, pacsu)
 
-                rows.append({
-                    "bigo": "", "sdate": sdate_dt, "created_time": now,
-                    "id": "인길환", "rname": vendor, "uname": uname,
-                    "co": base_co, "pkg": pkg,
-                    "order_qty": order_qty_packs, "order_qty_after": order_qty_packs,
-                    "prev_residue": prev_residue, "production_plan": 0,
-                    "produced_qty": produced_qty_val, "today_residue": 0,
-                })
+            rows.append({
+                "bigo": "", "sdate": sdate_dt, "created_time": now,
+                "id": "인길환", "rname": vendor, "uname": m["UNAME"],
+                "co": base_co, "pkg": m["PACKG"],
+                "order_qty": order_qty_packs, "order_qty_after": order_qty_packs,
+                "prev_residue": prev_residue, "production_plan": 0,
+                "produced_qty": produced_qty_val, "today_residue": 0,
+            })
 
         if not rows:
             QMessageBox.information(w, "안내", "INSERT할 데이터가 없습니다.")
@@ -445,9 +262,7 @@ class DataWriter:
 
         try:
             self._insert_dashboard_rows(rows)
-            self.generate_material_dashboard("DASHBOARD_RAW", "(정선)", ['502811'])
-            self.generate_material_dashboard("DASHBOARD_SAUCE", "소스", ['600901'])
-            self.dashboard_vege_from_dashboard()
+            generate_materials(sdate_str)
 
             QMessageBox.information(
                 w, "완료",
@@ -487,9 +302,8 @@ class DataWriter:
         uname_after_list = list(set(uname_after_list))
 
         # Dashboard_UNAME_MAP 조회하여 after → before 매핑
-        with db_connection(DB_NAME) as (conn, cur):
-            sql = "SELECT before_value, after_value FROM Dashboard_UNAME_MAP"
-            df_map = runquery(cur, sql)
+        sql = "SELECT before_value, after_value FROM Dashboard_UNAME_MAP"
+        df_map = cached_query(DB_NAME, sql)
 
         mapping = {}
         if df_map is not None and not df_map.empty:
@@ -516,17 +330,16 @@ class DataWriter:
 
         with db_connection(DB_NAME) as (conn, cur):
             placeholders = ", ".join(["%s"] * len(uname_final_list))
+            cond, dparams = date_range("sdate", sdate_str)
             sql = f"""
                 DELETE FROM ORDER_DASHBOARD
-                WHERE CONVERT(DATE, sdate) = %s
+                WHERE {cond}
                   AND UNAME IN ({placeholders})
             """
-            runquery(cur, sql, [sdate_str] + uname_final_list)
+            runquery(cur, sql, dparams + uname_final_list)
 
         try:
-            recalc_dashboard_raw_keep_manual(sdate_str)
-            recalc_dashboard_sauce_keep_manual(sdate_str)
-            recalc_dashboard_vege_keep_manual(sdate_str)
+            recalc_materials_keep_manual(sdate_str)
         except Exception as e:
             QMessageBox.critical(w, "재집계 오류", str(e))
             return
@@ -551,9 +364,10 @@ class DataWriter:
         if reply != QMessageBox.Yes:
             return
 
-        with db_connection(DB_NAME) as (conn, cur):
+        with db_connection(DB_NAME) as (conn, cur), transaction(conn):
             for tbl in ["ORDER_DASHBOARD", "DASHBOARD_RAW", "DASHBOARD_SAUCE", "DASHBOARD_VEGE"]:
-                runquery(cur, f"DELETE FROM {tbl} WHERE CONVERT(DATE, sdate) = %s", [sdate_str])
+                cond, dparams = date_range("sdate", sdate_str)
+                runquery(cur, f"DELETE FROM {tbl} WHERE {cond}", dparams)
 
         QMessageBox.information(w, "완료", f"{sdate_str} 자료 삭제 완료!")
         DashboardLogDialog.log_action(w.current_user, qdate, f"표 삭제 ({sdate_str})")
@@ -581,8 +395,7 @@ class DataWriter:
                 return
 
             try:
-                sql = "SELECT DISTINCT co FROM ORDER_DASHBOARD WHERE CONVERT(DATE, sdate) = %s"
-                df = runquery(cur, sql, [sdate_str])
+                df = run_statement(cur, "order.distinct_co_by_date", sdate=sdate_str)
             finally:
                 closedb(conn)
 
@@ -602,6 +415,11 @@ class DataWriter:
                     QMessageBox.critical(w, "DB 오류", msg)
                 return
 
+            try:
+                master_index.load(df[co_col])
+            except Exception as e:
+                print(f"[ERROR] MASTER 일괄 조회 실패: {e}")
+
             updated_cnt = 0
             try:
                 for co_val in df[co_col]:
@@ -618,14 +436,9 @@ class DataWriter:
                     produced_qty, recent_time_val = get_produced_qty_packs(co_str, sdate_str, pacsu)
 
                     try:
-                        runquery(
-                            cur_u,
-                            """
-                            UPDATE ORDER_DASHBOARD
-                            SET produced_qty = %s, recent_chulgo = %s
-                            WHERE CONVERT(DATE, sdate) = %s AND co = %s
-                            """,
-                            [produced_qty, recent_time_val, sdate_str, co_str],
+                        run_statement(
+                            cur_u, "order.update_produced",
+                            qty=produced_qty, recent=recent_time_val, sdate=sdate_str, co=co_str,
                         )
                         updated_cnt += 1
                     except Exception as e:
@@ -659,33 +472,31 @@ class DataWriter:
                 QMessageBox.information(w, "안내", "PRODUCT_LIST가 비어 있습니다.")
             return
 
-        with db_connection(DB_NAME) as (conn, cur):
-            for base_co, vendor in w.product_list:
-                base_co = str(base_co).strip()
-
-                pacsu = get_pacsu_by_co(base_co)
-                if pacsu is None or pacsu <= 0:
-                    pacsu = 1
-
-                new_qty_packs = int(
-                    calc_order_qty_packs(
-                        base_co=base_co, vendor=vendor,
-                        sdate_str=sdate_str, pacsu=pacsu,
-                    )
-                )
+        # 원천 워터마크가 움직인 품목만 다시 계산, DB 값과 같으면 UPDATE 도 생략
+        qty_map, changed = order_prefetch.refresh(w.product_list, sdate_str)
 
-                runquery(cur, """
-                    UPDATE ORDER_DASHBOARD
-                    SET order_qty_after = %s
-                    WHERE CONVERT(DATE, sdate) = %s AND co = %s
-                """, [new_qty_packs, sdate_str, base_co])
+        with db_connection(DB_NAME) as (conn, cur), transaction(conn):
+            df_now = run_statement(cur, "order.by_date", sdate=sdate_str)
+            current = {}
+            if df_now is not None and not df_now.empty:
+                for co, qty in zip(df_now["co"], df_now["order_qty_after"]):
+                    current.setdefault(str(co).strip(), None if pd.isna(qty) else int(qty))
 
-        recalc_dashboard_raw_keep_manual(sdate_str)
-        recalc_dashboard_sauce_keep_manual(sdate_str)
-        recalc_dashboard_vege_keep_manual(sdate_str)
+            updates = {co: int(qty) for co, qty in qty_map.items()
+                       if co in current and (co in changed or current[co] != int(qty))}
+            # (co, qty) 행 목록과 조인한 UPDATE 한 번 (품목이 많으면 파라미터 한도 단위로 나눔)
+            rows = sorted(updates.items())
+            chunk = rows_chunk_size("order.update_qty_after_bulk")
+            for i in range(0, len(rows), chunk):
+                run_statement(cur, "order.update_qty_after_bulk",
+                              sdate=sdate_str, rows=rows[i:i + chunk])
+        skipped = len(qty_map) - len(updates)
+
+        recalc_materials_keep_manual(sdate_str)
 
         msg = ("모든 제품의 최종 발주량(order_qty_after)이 재계산되었고,\n"
-               "원료/소스/야채 대시보드도 최신 기준으로 반영되었습니다.")
+               "원료/소스/야채 대시보드도 최신 기준으로 반영되었습니다.\n"
+               f"(갱신 {len(updates)}건 / 변경 없음 건너뜀 {skipped}건)")
         if not silent:
             QMessageBox.information(w, "완료", msg)
         else:
@@ -702,7 +513,7 @@ class DataWriter:
             QMessageBox.information(w, "안내", "완료 처리할 제품 행을 선택하세요.")
             return
 
-        with db_connection(DB_NAME) as (conn, cur):
+        with db_connection(DB_NAME) as (conn, cur), transaction(conn):
             for row in selected_rows:
                 item = table.item(row, 0)
                 if not item:
@@ -776,16 +587,17 @@ class DataWriter:
             return
 
         try:
-            df_jen = runquery(cur_jen, """
+            cond, dparams = date_range("jdate", sdate_str)
+            df_jen = runquery(cur_jen, f"""
                 SELECT tco, tuname, jnod, jno, lot
                 FROM jen
-                WHERE CONVERT(DATE, jdate) = %s
+                WHERE {cond}
                   AND jnod LIKE 'N%%'
                   AND (tuname LIKE '%%이마트%%' OR tuname LIKE '%%롯데%%'
                        OR tuname LIKE '%%홈플%%' OR tuname LIKE '%%컬리%%')
                   AND tuname NOT LIKE '%%정선%%'
                 ORDER BY jdate DESC
-            """, [sdate_str])
+            """, dparams)
         finally:
             closedb(conn_jen)
 
@@ -831,6 +643,7 @@ class DataWriter:
                 for co in group_map.get(tco, [tco]):
                     all_cos.add(co)
             gwchul_uname_map = self._fetch_gwchul_uname(list(all_cos))
+            master_index.load(all_cos, cur_pan)
 
             # 5) jen 각 행 → 그룹별 1:N → pan INSERT
             #    토요일 + 홈플/이마트/롯데인 경우: 토·일 분 각각 1행씩 INSERT
@@ -844,7 +657,32 @@ class DataWriter:
             except Exception:
                 pass
 
-            inserted = 0
+            def overrides_for(vendor):
+                # 분할 대상 업체 + 토요일이면 [토,일] 두 번, 그 외엔 한 번 (None=자동)
+                if day_dates_split is not None and vendor in SPLIT_VENDORS:
+                    return [tuple(d) for d in day_dates_split]
+                return [None]
+
+            # 업체·조회일 지정별로 품목을 모아 발주팩을 한 번에 계산
+            groups = {}     # {(vendor, dates_override): {co: pacsu}}
+            for _, row in df_jen.iterrows():
+                tco = str(row["tco"]).strip()
+                vendor = row["_vendor"]
+                for co in group_map.get(tco, [tco]):
+                    for dates_override in overrides_for(vendor):
+                        groups.setdefault((vendor, dates_override), {})[co] = self._get_master_info(co)[0]
+
+            packs_map = {}
+            for (vendor, dates_override), pacsu_map in groups.items():
+                got = calc_order_qty_packs_batch(
+                    [(co, vendor) for co in pacsu_map], sdate_str, pacsu_map,
+                    list(dates_override) if dates_override else None,
+                )
+                for co in pacsu_map:
+                    packs_map[(vendor, dates_override, co)] = int(got.get(co, 0))
+
+            pan_rows = []
+            lot_seq = {}
             for _, row in df_jen.iterrows():
                 tco = str(row["tco"]).strip()
                 vendor = row["_vendor"]
@@ -853,55 +691,35 @@ class DataWriter:
 
                 target_cos = group_map.get(tco, [tco])
 
-                # 분할 대상 업체 + 토요일이면 [토,일] 두 번, 그 외엔 한 번 (None=자동)
-                if day_dates_split is not None and vendor in SPLIT_VENDORS:
-                    overrides = day_dates_split
-                else:
-                    overrides = [None]
-
                 for co in target_cos:
                     uname = gwchul_uname_map.get(co, co)
-                    pacsu, packg = self._get_master_info(co)
-
-                    for dates_override in overrides:
-                        order_packs = int(calc_order_qty_packs(
-                            base_co=co, vendor=vendor,
-                            sdate_str=sdate_str, pacsu=pacsu,
-                            dates_override=dates_override,
-                        ))
+                    packg = self._get_master_info(co)[1]
+
+                    for dates_override in overrides_for(vendor):
+                        order_packs = packs_map[(vendor, dates_override, co)]
                         ipgokg = round(order_packs * packg, 2)
 
                         if order_packs <= 0 or ipgokg <= 0:
                             continue
 
-                        lot = self._generate_lot(cur_pan, co, sdate_str)
-
-                        runquery(cur_pan, """
-                            INSERT INTO pan (
-                                CO, ICO, UNAME, IUNAME, BIGO, PDATE,
-                                IPGO, IPGOKG, PAC,
-                                PAN, REST, JANG,
-                                RNAME, CH, CH2, DE, ID,
-                                JNAME, JNO, JNOD, CJ, GUBUN, LOT, PUM, JUM,
-                                CDATE
-                            ) VALUES (
-                                %s, %s, %s, %s, %s, %s,
-                                %s, %s, %s,
-                                %s, %s, %s,
-                                %s, %s, %s, %s, %s,
-                                %s, %s, %s, %s, %s, %s, %s, %s,
-                                GETDATE()
-                            )
-                        """, [
+                        lot = self._generate_lot(cur_pan, co, sdate_str, lot_seq)
+
+                        pan_rows.append([
                             co, co, uname, uname, uname, sdate_str,
                             0, ipgokg, order_packs,
                             0, 0, 0,
                             '작업', 'I', 'J', 'N', 'python-factory',
                             '공장(양념육)', jno, jnod, '생산품', 27, lot, '국내제조', '지점',
                         ])
-                        inserted += 1
 
-            conn_pan.commit()
+            with transaction(conn_pan):
+                inserted = bulk_insert(cur_pan, "pan", [
+                    "CO", "ICO", "UNAME", "IUNAME", "BIGO", "PDATE",
+                    "IPGO", "IPGOKG", "PAC",
+                    "PAN", "REST", "JANG",
+                    "RNAME", "CH", "CH2", "DE", "ID",
+                    "JNAME", "JNO", "JNOD", "CJ", "GUBUN", "LOT", "PUM", "JUM",
+                ], pan_rows, literals={"CDATE": "GETDATE()"})
         finally:
             closedb(conn_pan)
 
@@ -925,16 +743,17 @@ class DataWriter:
             return
 
         try:
-            df = runquery(cur, """
+            cond, dparams = date_range("PDATE", sdate_str)
+            df = runquery(cur, f"""
                 SELECT PKEY, CO, UNAME, PAC, IPGOKG, LOT, BIGO, ID, JNO, JNOD, PDATE
                 FROM pan
                 WHERE CH2 = 'J'
                   AND CH = 'I'
                   AND RNAME = '작업'
                   AND JNAME = '공장(양념육)'
-                  AND CONVERT(DATE, PDATE) = %s
+                  AND {cond}
                 ORDER BY UNAME, LOT
-            """, [sdate_str])
+            """, dparams)
         finally:
             closedb(conn)
 
@@ -1188,13 +1007,10 @@ class DataWriter:
     def _load_group_map():
         """GP.same_product에서 {co: [그룹 내 모든 co]} 매핑 반환"""
         group_map = {}
-        conn, cur = getdb("GP")
-        if conn is None:
-            return group_map
         try:
-            df = runquery(cur, "SELECT group_id, co FROM same_product")
-        finally:
-            closedb(conn)
+            df = cached_query("GP", "SELECT group_id, co FROM same_product")
+        except ConnectionError:
+            return group_map
 
         if df is None or df.empty:
             return group_map
@@ -1215,17 +1031,14 @@ class DataWriter:
         """GWCHUL.MASTER에서 CO→UNAME 매핑 딕셔너리 반환"""
         if not co_list:
             return {}
-        conn, cur = getdb("GWCHUL")
-        if conn is None:
-            return {}
+        placeholders = ", ".join(["%s"] * len(co_list))
         try:
-            placeholders = ", ".join(["%s"] * len(co_list))
-            df = runquery(cur, f"""
+            df = cached_query("GWCHUL", f"""
                 SELECT CO, UNAME FROM MASTER
                 WHERE CO IN ({placeholders})
             """, co_list)
-        finally:
-            closedb(conn)
+        except ConnectionError:
+            return {}
 
         result = {}
         if df is not None and not df.empty:
@@ -1234,56 +1047,38 @@ class DataWriter:
         return result
 
     @staticmethod
-    def _generate_lot(cur_pan, co, sdate_str):
-        """LOT 생성: {yyMMdd}{co6자리}{순번3자리}"""
+    def _generate_lot(cur_pan, co, sdate_str, lot_seq: dict = None):
+        """LOT 생성: {yyMMdd}{co6자리}{순번3자리}
+
+        lot_seq 를 넘기면 CO별 순번을 여기서 이어서 매긴다 (아직 INSERT 전인 행까지 반영, 조회는 CO당 1회).
+        """
         date_part = sdate_str.replace("-", "")[2:]  # 앞 2자리(세기) 제거
         co_part = co.strip()[:6].ljust(6, '0')
-        df = runquery(cur_pan, """
-            SELECT COUNT(*) AS cnt FROM pan
-            WHERE CO = %s
-              AND CONVERT(DATE, PDATE) = %s
-              AND CH = 'I'
-              AND CH2 = 'J'
-        """, [co, sdate_str])
-        seq = (int(df.iloc[0]["cnt"]) if df is not None and not df.empty else 0) + 1
+
+        if lot_seq is None or co not in lot_seq:
+            cond, dparams = date_range("PDATE", sdate_str)
+            df = runquery(cur_pan, f"""
+                SELECT COUNT(*) AS cnt FROM pan
+                WHERE CO = %s
+                  AND {cond}
+                  AND CH = 'I'
+                  AND CH2 = 'J'
+            """, [co] + dparams)
+            count = int(df.iloc[0]["cnt"]) if df is not None and not df.empty else 0
+        else:
+            count = lot_seq[co]
+
+        seq = count + 1
+        if lot_seq is not None:
+            lot_seq[co] = seq
         return f"{date_part}{co_part}{str(seq).zfill(3)}"
 
     @staticmethod
     def _get_master_info(co: str):
-        pacsu = 1
-        packg = 0.0
-        try:
-            conn, cur = getdb("GFOOD_B")
-        except Exception:
-            return pacsu, packg
-        try:
-            df = runquery(cur, """
-                SELECT TOP 1 PACSU, PACKG FROM MASTER WHERE CO = %s
-            """, [co])
-        finally:
-            closedb(conn)
-
-        if df is None or df.empty:
-            return pacsu, packg
-
-        m = df.iloc[0]
-
-        raw_pacsu = m.get("PACSU", 1)
         try:
-            pacsu = int(raw_pacsu if raw_pacsu not in (None, "") else 1)
-            if pacsu <= 0:
-                pacsu = 1
+            m = master_index.get(co)
         except Exception:
-            pacsu = 1
-
-        raw_packg = m.get("PACKG", None)
-        if raw_packg is not None:
-            try:
-                packg = float(raw_packg)
-            except Exception:
-                try:
-                    packg = float(str(raw_packg).replace("KG", "").replace("kg", "").strip())
-                except Exception:
-                    packg = 0.0
-
-        return pacsu, packg
+            return 1, 0.0
+        if m is None:
+            return 1, 0.0
+        return m["PACSU"], m["PACKG"]
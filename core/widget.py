@@ -15,7 +15,7 @@ from UI.dashboard import Ui_Form
 from UTIL.const import (
     DB_NAME, PAGE_SIZE, DEFAULT_VENDOR, VENDORS_ROTATION,
 )
-from UTIL.db_handler import runquery, db_connection
+from UTIL.db_handler import runquery, db_connection, cached_query
 from UTIL.db_product_handler import fetch_default_products
 from dialog.DashboardLogDialog import DashboardLogDialog
 from dialog.ProductNameDialog import ProductNameDialog
@@ -27,6 +27,7 @@ from core.data_loader import DataLoader
 from core.data_writer import DataWriter
 from core.timer_manager import TimerManager
 from core.excel_export import export_excel
+from logic.order_prefetch import order_prefetch
 
 
 class OrderDashboardWidget(QWidget):
@@ -150,6 +151,7 @@ class OrderDashboardWidget(QWidget):
         # 최초 로딩
         self.loader.load_product_tab()
         self.table_ui.apply_column_visibility_rules()
+        order_prefetch.prefetch_async(self.product_list, self.ui.dateEdit.date())
 
     # ---------------------------------------------------------
     # 유틸리티 헬퍼
@@ -270,17 +272,16 @@ class OrderDashboardWidget(QWidget):
         """Dashboard_UNAME_MAP 테이블에서 매핑 정보 로드하여 캐시 갱신"""
         self.uname_map_cache = {}
         try:
-            with db_connection(DB_NAME) as (conn, cur):
-                sql = "SELECT before_value, after_value FROM Dashboard_UNAME_MAP"
-                df = runquery(cur, sql)
-                if df is not None and not df.empty:
-                    for _, row in df.iterrows():
-                        bf = str(row['before_value']).strip()
-                        af = row['after_value']
-                        if af is not None:
-                            af = str(af).strip()
-                            if af:
-                                self.uname_map_cache[bf] = af
+            sql = "SELECT before_value, after_value FROM Dashboard_UNAME_MAP"
+            df = cached_query(DB_NAME, sql)
+            if df is not None and not df.empty:
+                for _, row in df.iterrows():
+                    bf = str(row['before_value']).strip()
+                    af = row['after_value']
+                    if af is not None:
+                        af = str(af).strip()
+                        if af:
+                            self.uname_map_cache[bf] = af
         except Exception as e:
             print(f"매핑 캐시 로드 실패: {e}")
 
@@ -316,6 +317,7 @@ class OrderDashboardWidget(QWidget):
         weekday_str = qdate.toString("ddd")
         self.ui.dateText.setText(f"{date_str} ({weekday_str})")
         self._tab_loader(self.ui.tabWidget.currentIndex())
+        order_prefetch.prefetch_async(self.product_list, qdate)
 
     def on_click_tab_product(self):
         self.ui.tabWidget.setCurrentIndex(0)
@@ -16,7 +16,7 @@ from PyQt5.QtCore import Qt, QDate
 from PyQt5.QtGui import QFont
 
 from UTIL.utils_qt import apply_table_style
-from UTIL.db_handler import getdb, closedb, runquery
+from UTIL.db_handler import getdb, closedb, runquery, runquery_iter, next_day
 
 class DashboardLogDialog(QDialog):
     """
@@ -112,6 +112,7 @@ class DashboardLogDialog(QDialog):
 
     def load_logs(self):
         sdate_str = self.dateEdit.date().toString("yyyy-MM-dd")
+        self.table.setRowCount(0)
 
         conn, cur = getdb("GP")
         try:
@@ -125,43 +126,36 @@ class DashboardLogDialog(QDialog):
                     content, 
                     bigo
                 FROM DASHBOARD_LOGS
-                WHERE CONVERT(DATE, sdate) = %s
+                WHERE sdate >= %s AND sdate < %s
                 ORDER BY modified_time DESC, PK DESC
             """
-            df = runquery(cur, sql, [sdate_str])
+            # 청크 단위로 받아 바로 테이블에 채움 (전체 결과를 메모리에 두 번 올리지 않음)
+            for df in runquery_iter(cur, sql, [sdate_str, next_day(sdate_str)], chunk_size=1000):
+                self._append_log_rows(df)
         except Exception as e:
             QMessageBox.critical(self, "DB 오류", str(e))
             return
         finally:
             closedb(conn)
 
-        self.table.setRowCount(0)
-
         # 결과 없을 때
-        if df is None or len(df) == 0:
+        if self.table.rowCount() == 0:
             QMessageBox.information(self, "안내", f"{sdate_str} 로그 데이터가 없습니다.")
-            return
 
-        df = pd.DataFrame(df)
+    def _append_log_rows(self, df):
         df.columns = [str(c).upper() for c in df.columns]
-        self.table.setRowCount(len(df))
+        start = self.table.rowCount()
+        self.table.setRowCount(start + len(df))
 
         # 테이블에 데이터 채우기
-        for row_idx, row in enumerate(df.itertuples(index=False)):
-            pk = str(row.PK)
+        for row_idx, row in enumerate(df.itertuples(index=False), start=start):
             modified_time = row.MODIFIED_TIME
             user_id = str(row.USER_ID)
-            sdate = row.SDATE
             uname = str(row.UNAME) if row.UNAME else ""
             content = str(row.CONTENT) if row.CONTENT else ""
 
             # 날짜/시간 포맷
             mod_time_str = self._to_datetime_str(modified_time)
-            
-            if hasattr(sdate, "strftime"):
-                sdate_str2 = sdate.strftime("%Y-%m-%d")
-            else:
-                sdate_str2 = str(sdate)
 
             row_data = [
                 mod_time_str,  # 변경시각
@@ -4,7 +4,8 @@ from PyQt5.QtWidgets import (
     QLabel, QStyledItemDelegate, QSpinBox
 )
 from PyQt5.QtCore import Qt
-from UTIL.db_handler import getdb, runquery, closedb
+from UTIL.db_handler import getdb, runquery, closedb, invalidate_cache
+from logic.master_data import master_index
 
 # 업체 목록
 RETAILERS = ["코스트코", "이마트", "홈플러스", "마켓컬리", "롯데"]
@@ -218,6 +219,8 @@ class ProductNameDialog(QDialog):
                 )
 
             conn.commit()
+            invalidate_cache("Dashboard_UNAME_MAP")
+            master_index.invalidate()
 
             # 메인 캐시 갱신
             if self.parent() and hasattr(self.parent(), "refresh_uname_map_cache"):
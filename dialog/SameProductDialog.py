@@ -5,7 +5,8 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt
 
-from UTIL.db_handler import getdb, runquery, closedb
+from UTIL.db_handler import getdb, runquery, closedb, invalidate_cache
+from logic.master_data import master_index
 from UTIL.utils_qt import apply_table_style
 from dialog.MasterSearchDialog import MasterSearchDialog
 
@@ -255,6 +256,8 @@ class SameProductDialog(QDialog):
                 VALUES (%s, %s, %s)
             """, [new_gid, co, uname])
             conn.commit()
+            invalidate_cache("same_product")
+            master_index.invalidate()
         finally:
             closedb(conn)
 
@@ -285,6 +288,8 @@ class SameProductDialog(QDialog):
                 DELETE FROM same_product WHERE group_id = %s
             """, [self._current_group_id])
             conn.commit()
+            invalidate_cache("same_product")
+            master_index.invalidate()
         finally:
             closedb(conn)
 
@@ -322,6 +327,8 @@ class SameProductDialog(QDialog):
                 VALUES (%s, %s, %s)
             """, [self._current_group_id, co, uname])
             conn.commit()
+            invalidate_cache("same_product")
+            master_index.invalidate()
         finally:
             closedb(conn)
 
@@ -347,6 +354,8 @@ class SameProductDialog(QDialog):
                     DELETE FROM same_product WHERE co = %s
                 """, [co])
             conn.commit()
+            invalidate_cache("same_product")
+            master_index.invalidate()
         finally:
             closedb(conn)
 
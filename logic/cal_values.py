@@ -3,373 +3,22 @@
 # OrderDashboardWidget 에서 #7. DB 조회/계산 헬퍼 함수 분리 버전
 # -----------------------------------------------------
 
-from datetime import datetime, timedelta
-from UTIL.db_handler import getdb, runquery, closedb
-import pandas as pd
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from UTIL.db_handler import getdb, closedb, db_connection
+from UTIL.sql_registry import run_statement, cached_statement
+from logic.master_data import master_index, code_index
+from logic.vendor_rules import get_vendor_rules
+from UTIL.util import trace, trace_enabled
 DB_NAME = "GP"
 
 
-# -----------------------------------------------------
-# 토요일이면 [토, 일] 두 날짜, 그 외에는 [입력일] 단일 리스트 반환
-# (마켓컬리는 별도 처리, 사용 안 함)
-# -----------------------------------------------------
-def _get_query_dates(sdate_str: str) -> list:
-    try:
-        dt = datetime.strptime(sdate_str, "%Y-%m-%d")
-        if dt.weekday() == 5:
-            return [sdate_str, (dt + timedelta(days=1)).strftime("%Y-%m-%d")]
-    except Exception:
-        pass
-    return [sdate_str]
-
-
-# -----------------------------------------------------
-# 홈플러스 발주량 조회
-# -----------------------------------------------------
-def get_homeplus_order_qty(co: str, sdate_str: str, dates_override: list = None) -> int:
-    date_list = dates_override if dates_override else _get_query_dates(sdate_str)
-    placeholders = ",".join(["%s"] * len(date_list))
-
-    conn, cur = getdb("GWCHUL")
-    try:
-        sql = f"""
-            SELECT ISNULL(SUM(PAN), 0) AS sum_pan
-            FROM PAN
-            WHERE CO = %s
-              AND CONVERT(DATE, PDATE) IN ({placeholders})
-              AND DE = 'N'
-        """
-        df = runquery(cur, sql, [co] + date_list)
-    finally:
-        closedb(conn)
-
-    if df is None or df.empty:
-        return 0
-
-    try:
-        return int(df.iloc[0, 0] or 0)
-    except:
-        return 0
-
-
-# -----------------------------------------------------
-# 이마트 발주량 조회
-# -----------------------------------------------------
-def get_emart_order_qty(tco: str, sdate_str: str, dates_override: list = None) -> int:
-    conn, cur = getdb("GFOOD_B")
-    try:
-        sql_key = """
-            SELECT TOP 1 CO
-            FROM MMASTER
-            WHERE TCO = %s
-        """
-        df_key = runquery(cur, sql_key, [tco])
-        if df_key is None or df_key.empty:
-            return 0
-
-        real_co = str(df_key.iloc[0]["CO"]).strip()
-        if not real_co:
-            return 0
-
-        date_list = dates_override if dates_override else _get_query_dates(sdate_str)
-        placeholders = ",".join(["%s"] * len(date_list))
-
-        sql = f"""
-            SELECT SUM(PANKG) AS sum_pan
-            FROM MPAN
-            WHERE CO = %s
-              AND CONVERT(DATE, SDATE) IN ({placeholders})
-              AND DE = 'N'
-        """
-        df = runquery(cur, sql, [real_co] + date_list)
-    finally:
-        closedb(conn)
-
-    if df is None or df.empty:
-        return 0
-
-    try:
-        return int(df.iloc[0, 0] or 0)
-    except:
-        return 0
-
-
-# -----------------------------------------------------
-# 마켓컬리 발주량 조회
-# -----------------------------------------------------
-def get_kurly_order_qty(tco: str, sdate_str: str) -> int:
-    conn, cur = getdb("GFOOD_B")
-    try:
-        sql_key = """
-            SELECT TOP 1 CO
-            FROM MMASTER
-            WHERE TCO = %s
-        """
-        df_key = runquery(cur, sql_key, [tco])
-        if df_key is None or df_key.empty:
-            return 0
-
-        real_co = str(df_key.iloc[0]["CO"]).strip()
-        if not real_co:
-            return 0
-
-        # 토요일(5)이면 다음날(일요일) 데이터 조회
-        query_date_str = sdate_str
-        try:
-            dt = datetime.strptime(sdate_str, "%Y-%m-%d")
-            if dt.weekday() == 5:
-                dt_next = dt + timedelta(days=1)
-                query_date_str = dt_next.strftime("%Y-%m-%d")
-        except:
-            pass
-
-        sql = """
-            SELECT SUM(PANKG) AS sum_pan
-            FROM MPAN
-            WHERE CO = %s
-              AND CONVERT(DATE, SDATE) = %s
-              AND DE = 'N'
-        """
-        df = runquery(cur, sql, [real_co, query_date_str])
-    finally:
-        closedb(conn)
-
-    if df is None or df.empty:
-        return 0
-
-    try:
-        return int(df.iloc[0, 0] or 0)
-    except:
-        return 0
-
-
-# -----------------------------------------------------
-# 롯데 발주량 조회
-# -----------------------------------------------------
-def get_lotte_order_qty(co: str, sdate_str: str, dates_override: list = None) -> int:
-    """
-    롯데 양념육 발주량 조회
-    1. MJEN 테이블에서 rname='롯데', JBIGO='양념육', sdate 조건으로 JNO 리스트 추출
-    2. MPAN 테이블에서 해당 JNO와 CO로 발주량 조회
-    """
-    date_list = dates_override if dates_override else _get_query_dates(sdate_str)
-    date_placeholders = ",".join(["%s"] * len(date_list))
-
-    conn, cur = getdb("GFOOD_B")
-    try:
-        # 1단계: MJEN에서 JNO 리스트 추출 (토요일이면 토+일 포함)
-        sql_jno = f"""
-            SELECT JNO
-            FROM MJEN
-            WHERE rname LIKE '%롯데%'
-              AND JBIGO = '양념육'
-              AND CONVERT(DATE, SDATE) IN ({date_placeholders})
-              AND DE = 'N'
-        """
-        df_jno = runquery(cur, sql_jno, date_list)
-        
-        if df_jno is None or df_jno.empty:
-            return 0
-        
-        # JNO 리스트 추출
-        jno_list = [str(row['JNO']).strip() for _, row in df_jno.iterrows()]
-        
-        if not jno_list:
-            return 0
-        
-        # 2단계: MPAN에서 해당 JNO와 CO로 발주량 조회
-        placeholders = ','.join(['%s'] * len(jno_list))
-        sql_mpan = f"""
-            SELECT SUM(PANKG) AS sum_pan
-            FROM MPAN
-            WHERE JNO IN ({placeholders})
-              AND CO = %s
-              AND DE = 'N'
-        """
-        params = jno_list + [co]
-        df_pan = runquery(cur, sql_mpan, params)
-        
-    finally:
-        closedb(conn)
-    
-    if df_pan is None or df_pan.empty:
-        return 0
-    
-    try:
-        return int(df_pan.iloc[0, 0] or 0)
-    except:
-        return 0
-
-
-
-# -----------------------------------------------------
-# 코스온 발주량 조회
-# -----------------------------------------------------
-def get_coson_order_qty(base_co: str, sdate_str: str) -> int:
-    conn, cur = getdb("GWCHUL")
-    try:
-        # MASTER 에서 TCO3 조회
-        sql_master = """
-            SELECT TOP 1 TCO3
-            FROM MASTER
-            WHERE CO = %s
-        """
-        df_key = runquery(cur, sql_master, [base_co])
-        if df_key is None or df_key.empty:
-            return 0
-
-        tco3 = str(df_key.iloc[0]["TCO3"]).strip()
-        if not tco3:
-            return 0
-
-        # COSONC 조회
-        sql_coson = """
-            SELECT TOP 1 FINAL_QTY
-            FROM COSONC
-            WHERE LCODE = %s
-              AND CONVERT(DATE, LDATE) = %s
-        """
-        df = runquery(cur, sql_coson, [tco3, sdate_str])
-    finally:
-        closedb(conn)
-
-    if df is None or df.empty:
-        return 0
-
-    try:
-        return int(df.iloc[0, 0] or 0)
-    except:
-        return 0
-
-
-# ------------------------------
-# 매핑 테이블
-# ------------------------------
-COSTCO_META = {
-    "501998": {"type": "일반", "pack_weight": 0,   "day_adj": 1, "mon_adj": -1, "sun_prod": False},
-    "520033": {"type": "일반", "pack_weight": 0,   "day_adj": 1, "mon_adj": -1, "sun_prod": False},
-    "520427": {"type": "자율", "pack_weight": 2.6, "day_adj": 1, "mon_adj": 0,  "sun_prod": True},
-    "520261": {"type": "자율", "pack_weight": 2.3, "day_adj": 0, "mon_adj": 0,  "sun_prod": True},
-    "520513": {"type": "자율", "pack_weight": 2.3, "day_adj": 0, "mon_adj": 0,  "sun_prod": True},
-}
-
-
-def get_costco_order_qty(base_co: str, sdate_str: str) -> int:
-    """
-    Costco 발주량 계산
-    """
-
-    print("\n==========[COSTCO DEBUG START]============")
-    print(f"[INPUT] base_co = {base_co}, sdate_str = {sdate_str}")
-
-    meta = COSTCO_META.get(base_co)
-    print(f"[META] {meta}")
-
-    if meta is None:
-        print("[STOP] meta 없음 → 0 리턴")
-        return 0
-
-    # ------------------------------
-    # 날짜 계산
-    # ------------------------------
-    sdate = datetime.strptime(sdate_str, "%Y-%m-%d")
-    print(f"[DATE] 원본 입고일 = {sdate}")
-
-    # 1) 기본 입고일 보정
-    target_date = sdate + timedelta(days=meta["day_adj"])
-    print(f"[DATE] 기본 보정(+{meta['day_adj']}) = {target_date}")
-
-    # 2) 월요일 보정
-    if target_date.weekday() == 0:  # Monday
-        print(f"[DATE] 월요일 감지 → 월요일보정({meta['mon_adj']}) 적용")
-        target_date += timedelta(days=meta["mon_adj"])
-
-    print(f"[DATE] 최종 보정 날짜 = {target_date} (weekday={target_date.weekday()})")
-
-    # 3) 일요일 생산 불가 처리
-    if target_date.weekday() == 6:  # Sunday
-        print("[DATE] 최종 조회일이 일요일임")
-        if not meta["sun_prod"]:
-            print("[STOP] 일요일 생산 불가 상품 → 발주량 = 0")
-            return 0
-        else:
-            print("[INFO] 일요일 생산 허용 → 계속 진행")
-
-    target_date_str = target_date.strftime("%Y-%m-%d")
-    print(f"[DATE] 최종 조회일 문자열 = {target_date_str}")
-
-    # ------------------------------
-    # COS_B 조회
-    # ------------------------------
-    print("\n[DB] COS_B 조회 SQL 실행")
-    conn, cur = getdb("GWCHUL")
-
-    try:
-        sql = """
-            SELECT ISNULL(SUM(CONVERT(int, C17)), 0) AS sum_pack
-            FROM COS_B
-            WHERE REPLACE(RTRIM(LTRIM(C29)), ' ', '') = %s
-              AND CONVERT(DATE, C06) = %s
-        """
-        print(f"[DB] SQL param = base_co={base_co}, C06={target_date_str}")
-        df = runquery(cur, sql, [base_co, target_date_str])
-
-    finally:
-        closedb(conn)
-
-    if df is None or df.empty:
-        print("[DB] 조회 결과 없음(df empty) → 0")
-        return 0
-
-    total_pack = int(df.iloc[0, 0] or 0)
-    print(f"[DB RESULT] sum_pack(raw) = {total_pack}")
-
-    # ------------------------------
-    # 자율 유형 처리
-    # ------------------------------
-    if meta["type"] == "자율":
-        pw = meta["pack_weight"]
-        print(f"[TYPE] 자율 유형. 팩중량 = {pw}")
-        if pw > 0:
-            final_qty = int(round(total_pack / pw))
-            print(f"[CALC] round(total_pack / {pw}) = {final_qty}")
-            print("==========[COSTCO DEBUG END]============\n")
-            return final_qty
-        else:
-            print("[ERROR] pack_weight = 0 이므로 나누기 불가 → original pack 사용")
-
-    # ------------------------------
-    # 일반 유형
-    # ------------------------------
-    print(f"[TYPE] 일반 유형. 발주량 = {total_pack}")
-    print("==========[COSTCO DEBUG END]============\n")
-    return total_pack
-
-
-
-
 # -----------------------------------------------------
 # 이마트 MASTER용 CO 변환
 # -----------------------------------------------------
 def get_emart_master_co(base_co: str) -> str:
-    conn, cur = getdb("GFOOD_B")
-    try:
-        sql = """
-            SELECT TOP 1 TCO
-            FROM MMASTER
-            WHERE CO = %s
-        """
-        df = runquery(cur, sql, [base_co])
-    finally:
-        closedb(conn)
-
-    if df is None or df.empty:
-        return base_co
-
-    try:
-        return str(df.iloc[0]["TCO"]).strip()
-    except:
-        return base_co
+    return code_index.co_to_tco(base_co) or base_co
 
 
 # -----------------------------------------------------
@@ -377,28 +26,8 @@ def get_emart_master_co(base_co: str) -> str:
 # -----------------------------------------------------
 def get_pacsu_by_co(co: str) -> int:
     try:
-        conn, cur = getdb("GFOOD_B")
-    except:
-        return 1
-
-    try:
-        sql = """
-            SELECT TOP 1 PACSU
-            FROM MASTER
-            WHERE CO = %s
-        """
-        df = runquery(cur, sql, [co])
-    finally:
-        closedb(conn)
-
-    if df is None or df.empty:
-        return 1
-
-    val = df.iloc[0]["PACSU"]
-    try:
-        pacsu = int(val)
-        return pacsu if pacsu > 0 else 1
-    except:
+        return master_index.pacsu(co)
+    except Exception:
         return 1
 
 
@@ -412,15 +41,7 @@ def get_produced_qty_packs(co: str, sdate_str: str, pacsu: int) -> tuple:
         return 0
 
     try:
-        sql = """
-            SELECT ISNULL(SUM(PAN),0) AS sum_pan, MAX(CDATE) as max_time
-            FROM PAN
-            WHERE CH = 'C'
-              AND JNAME = '공장(양념육)'
-              AND CO = %s
-              AND CONVERT(DATE, PDATE) = %s
-        """
-        df = runquery(cur, sql, [co, sdate_str])
+        df = run_statement(cur, "pan.produced", co=co, sdate=sdate_str)
     finally:
         closedb(conn)
 
@@ -448,13 +69,7 @@ def get_produced_qty_packs(co: str, sdate_str: str, pacsu: int) -> tuple:
 def get_prev_residue_from_today(co: str) -> int:
     conn, cur = getdb("GP")
     try:
-        sql = """
-            SELECT TOP 1 today_residue
-            FROM ORDER_DASHBOARD
-            WHERE co = %s
-            ORDER BY PK DESC
-        """
-        df = runquery(cur, sql, [co])
+        df = run_statement(cur, "order.last_today_residue", co=co)
     finally:
         closedb(conn)
 
@@ -468,589 +83,153 @@ def get_prev_residue_from_today(co: str) -> int:
 
 
 # -----------------------------------------------------
-# PAN 기반 재고(box) 조회
-# -----------------------------------------------------
-def get_stock_from_pan(bco: str, sdate_str: str) -> int:
-    conn, cur = getdb("GFOOD_B")
-    try:
-        sql = """
-            SELECT SUM(A.IPGO) - SUM(A.PAN) as stock_box
-            FROM PAN A
-            WHERE A.CH <> 'M'
-              AND A.CO = %s
-              AND A.PDATE <= CONVERT(smalldatetime, %s)
-              AND A.JNAME <> ''
-              AND A.JUM = '지점'
-              AND A.DE = 'N'
-            GROUP BY A.JNAME
-        """
-        df = runquery(cur, sql, [bco, sdate_str])
-    finally:
-        closedb(conn)
-
-    if df is None or df.empty:
-        return 0
-
-    total = 0
-    for v in df.iloc[:, 0]:
-        try:
-            val = int(v)
-            if val > 0:
-                total += val
-        except:
-            pass
-
-    return total
-
-
-# -----------------------------------------------------
-# 레시피 기반 PLAN_KG 계산 (PRODUCTION_PLAN 사용)
-# -----------------------------------------------------
-def calc_plan_kg_by_recipe(df_order, recipe_keyword: str, bco_list: list = None):
-    """
-    ORDER_DASHBOARD 기반 원료/소스용 PLAN_KG 계산
-    PLAN_PACKS = PRODUCTION_PLAN
-
-    bco_list: BCO가 이 리스트에 포함되면 OR 조건으로 RECIPE에서 조회됨
-              (예: 원료/소스 외에 야채 등 별도 BCO 강제 포함)
-    """
-
-    if df_order is None or df_order.empty:
-        print("[PLAN_KG] df_order is empty → return None")
-        return None
-
-    df_order = df_order.copy()
-    df_order.columns = [c.upper() for c in df_order.columns]
-    df_order["CO"] = df_order["CO"].astype(str).str.strip()
-
-    print(f"[PLAN_KG] df_order rows = {len(df_order)}")
-    print(f"[PLAN_KG] recipe_keyword = {recipe_keyword}")
-    print(f"[PLAN_KG] bco_list = {bco_list}")
-
-    co_list = df_order["CO"].unique().tolist()
-    if not co_list:
-        print("[PLAN_KG] no CO list → return None")
-        return None
-
-    placeholders = ",".join(["%s"] * len(co_list))
-
-    # -----------------------------------------------------
-    # 1) RECIPE 조회 조건 동적 구성
-    # -----------------------------------------------------
-    where_clause = f"BUNAME LIKE %s"
-
-    params = co_list + [f"%{recipe_keyword}%"]
-
-    # BCO 리스트 조건 추가
-    if bco_list:
-        bco_placeholders = ",".join(["%s"] * len(bco_list))
-        where_clause = f"({where_clause} OR BCO IN ({bco_placeholders}))"
-        params.extend(bco_list)
-
-    # -----------------------------------------------------
-    # 최종 SQL 구성
-    # -----------------------------------------------------
-    sql = f"""
-        SELECT CO, BCO, BUNAME, SA
-        FROM RECIPE
-        WHERE CO IN ({placeholders})
-          AND {where_clause}
-    """
-
-    conn, cur = getdb("GFOOD_B")
-    try:
-        df_recipe = runquery(cur, sql, params)
-    finally:
-        closedb(conn)
-
-    print("[PLAN_KG] SQL params =", params)
-
-    if df_recipe is None or df_recipe.empty:
-        print("[PLAN_KG] df_recipe is empty → return None")
-        return None
-
-    df_recipe.columns = [c.upper() for c in df_recipe.columns]
-    df_recipe["CO"] = df_recipe["CO"].astype(str).str.strip()
-    df_recipe["BCO"] = df_recipe["BCO"].astype(str).str.strip()
-    df_recipe["SA"] = df_recipe["SA"].fillna(1).astype(float)
-
-    print(f"[PLAN_KG] RECIPE rows = {len(df_recipe)}")
-
-    # -----------------------------------------------------
-    # 2) MERGE
-    # -----------------------------------------------------
-    df = df_order.merge(df_recipe, on="CO", how="inner")
-    if df.empty:
-        print("[PLAN_KG] merge result empty → return None")
-        return None
-
-    print(f"[PLAN_KG] merged rows = {len(df)}")
-
-    # -----------------------------------------------------
-    # 3) PLAN_PACKS = PRODUCTION_PLAN
-    # -----------------------------------------------------
-    if "PRODUCTION_PLAN" not in df.columns:
-        df["PRODUCTION_PLAN"] = 0
-
-    df["PRODUCTION_PLAN"] = df["PRODUCTION_PLAN"].fillna(0).astype(float)
-    df["PKG"] = df["PKG"].fillna(0).astype(float)
-
-    df["PLAN_PACKS"] = df["PRODUCTION_PLAN"]
-
-    print("[PLAN_KG] PLAN_PACKS sample:", df["PLAN_PACKS"].head().tolist())
-
-    # -----------------------------------------------------
-    # 4) PLAN_KG 계산
-    # -----------------------------------------------------
-    df["PLAN_KG"] = df["PLAN_PACKS"] * df["PKG"] * df["SA"] / 100
-
-    print("[PLAN_KG] PLAN_KG sample:", df["PLAN_KG"].head().tolist())
-
-    df = df[df["PLAN_KG"] > 0]
-    if df.empty:
-        print("[PLAN_KG] PLAN_KG <= 0 for all rows → return None")
-        return None
-
-    # -----------------------------------------------------
-    # 5) groupby
-    # -----------------------------------------------------
-    grouped = df.groupby(["BCO", "BUNAME"], as_index=False)["PLAN_KG"].sum()
-
-    print(f"[PLAN_KG] grouped rows = {len(grouped)}")
-    print("[PLAN_KG] grouped sample:")
-    print(grouped.head())
-
-    return grouped
-
-
-# -----------------------------------------------------
-# 벤더별 최종 발주팩 계산 공통 함수
-# -----------------------------------------------------
-def calc_order_qty_packs(base_co: str, vendor: str, sdate_str: str, pacsu: int,
-                         dates_override: list = None) -> int:
-    vendor = (vendor or "").strip()
-
-    if pacsu is None or pacsu <= 0:
-        pacsu = 1
-
-    if vendor == "홈플러스":
-        box_qty = get_homeplus_order_qty(base_co, sdate_str, dates_override)
-        return box_qty * pacsu
-
-    if vendor == "이마트":
-        packs = get_emart_order_qty(base_co, sdate_str, dates_override)
-        return packs * pacsu
-
-    if vendor == "마켓컬리":
-        return get_kurly_order_qty(base_co, sdate_str)
-
-    if vendor == "롯데":
-        packs = get_lotte_order_qty(base_co, sdate_str, dates_override)
-        return packs * pacsu
-
-    if vendor == "코스온":
-        return get_coson_order_qty(base_co, sdate_str)
-
-    if vendor == "코스트코":
-        return get_costco_order_qty(base_co, sdate_str)
-
-    return 0
-
-
-# -----------------------------------------------------
-# RAW 재계산 (PRODUCTION_PLAN 사용)
-# -----------------------------------------------------
-def recalc_dashboard_raw_keep_manual(qdate):
-    if isinstance(qdate, str):
-        sdate_str = qdate
-        sdate_dt = datetime.strptime(qdate, "%Y-%m-%d")
-    else:
-        sdate_str = qdate.toString("yyyy-MM-dd")
-        sdate_dt = datetime(qdate.year(), qdate.month(), qdate.day(), 0, 0, 0)
-    now = datetime.now()
-
-    # ORDER_DASHBOARD 조회 (pre_production_qty → production_plan)
-    conn, cur = getdb(DB_NAME)
-    try:
-        sql = """
-            SELECT co, order_qty_after, production_plan, prev_residue, pkg
-            FROM ORDER_DASHBOARD
-            WHERE CONVERT(DATE, sdate) = %s
-        """
-        df_order = runquery(cur, sql, [sdate_str])
-    finally:
-        closedb(conn)
-
-    if df_order is None or df_order.empty:
-        return
-
-    df_order.columns = [c.upper() for c in df_order.columns]
-    df_order["CO"] = df_order["CO"].astype(str).str.strip()
-
-    # 레시피 기반 PLAN_KG
-    grouped = calc_plan_kg_by_recipe(df_order, "(정선)")
-    if grouped is None or grouped.empty:
-        return
-
-    valid_keys = {
-        (str(r.BCO).strip(), str(r.BUNAME).strip())
-        for r in grouped.itertuples(index=False)
-    }
-
-    # 기존 RAW 조회
-    conn, cur = getdb(DB_NAME)
-    try:
-        sql = """
-            SELECT PK, uname, co
-            FROM DASHBOARD_RAW
-            WHERE CONVERT(DATE, sdate) = %s
-        """
-        df_exist = runquery(cur, sql, [sdate_str])
-    finally:
-        closedb(conn)
-
-    exist_map = {}
-    if df_exist is not None and not df_exist.empty:
-        df_exist.columns = [c.upper() for c in df_exist.columns]
-        for r in df_exist.itertuples(index=False):
-            exist_map[(str(r.CO).strip(), str(r.UNAME).strip())] = r
-
-    # DELETE rows not needed
-    delete_keys = set(exist_map.keys()) - valid_keys
-    if delete_keys:
-        conn, cur = getdb(DB_NAME)
-        try:
-            for co, uname in delete_keys:
-                runquery(
-                    cur,
-                    """
-                    DELETE FROM DASHBOARD_RAW
-                    WHERE CO=%s AND UNAME=%s
-                      AND CONVERT(DATE, sdate)=%s
-                    """,
-                    [co, uname, sdate_str],
-                )
-        finally:
-            closedb(conn)
-
-    # UPDATE / INSERT
-    conn, cur = getdb(DB_NAME)
-    try:
-        for r in grouped.itertuples(index=False):
-            bco = str(r.BCO).strip()
-            buname = str(r.BUNAME).strip()
-            qty_int = int(round(float(r.PLAN_KG or 0)))
-
-            key = (bco, buname)
-            exist = exist_map.get(key)
-
-            if exist:
-                sql_up = """
-                    UPDATE DASHBOARD_RAW
-                    SET order_qty_after = %s
-                    WHERE PK = %s
-                """
-                runquery(cur, sql_up, [qty_int, exist.PK])
-
+# PAN 기반 재고(box) 조회 — 지점별 재고 중 양수만 합산
+#   같은 날짜의 BCO 들을 GROUP BY 한 번으로 조회하고 (날짜, BCO) 별로 잠시 보관
+# -----------------------------------------------------
+STOCK_CACHE_TTL_SEC = 60
+STOCK_LOAD_CHUNK = 1000
+
+
+class StockCache:
+    """{(sdate, bco): 재고} — 없거나 오래된 키만 모아서 한 번에 조회"""
+
+    def __init__(self, ttl: float = STOCK_CACHE_TTL_SEC):
+        self.ttl = ttl
+        self._rows = {}         # {(sdate, bco): (적재 시각, 재고)}
+        self._lock = threading.Lock()
+        self.queries = 0
+
+    def get_many(self, bcos, sdate_str: str) -> dict:
+        bcos = sorted({str(b).strip() for b in bcos if b is not None and str(b).strip()})
+        now = time.monotonic()
+        with self._lock:
+            missing = [b for b in bcos
+                       if now - self._rows.get((sdate_str, b), (-self.ttl, 0))[0] >= self.ttl]
+
+        if missing:
+            loaded = dict.fromkeys(missing, 0)
+            with db_connection("GFOOD_B") as (conn, cur):
+                for i in range(0, len(missing), STOCK_LOAD_CHUNK):
+                    df = run_statement(cur, "pan.stock_by_cos", cos=missing[i:i + STOCK_LOAD_CHUNK],
+                                       sdate=sdate_str)
+                    self.queries += 1
+                    if df is not None and not df.empty:
+                        for bco, stock in zip(df.iloc[:, 0], df.iloc[:, 1]):
+                            try:
+                                loaded[str(bco).strip()] = int(stock or 0)
+                            except (TypeError, ValueError):
+                                pass
+            with self._lock:
+                for bco, stock in loaded.items():
+                    self._rows[(sdate_str, bco)] = (now, stock)
+
+        with self._lock:
+            return {b: self._rows[(sdate_str, b)][1] for b in bcos if (sdate_str, b) in self._rows}
+
+    def invalidate(self, sdate_str: str = None) -> None:
+        with self._lock:
+            if sdate_str is None:
+                self._rows.clear()
             else:
-                stock_val = get_stock_from_pan(bco, sdate_str)
-                sql_in = """
-                    INSERT INTO DASHBOARD_RAW (
-                        uname, co, sdate, created_time,
-                        stock, order_qty, order_qty_after,
-                        prepro_qty, ipgo_qty
-                    )
-                    VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s)
-                """
-                runquery(
-                    cur,
-                    sql_in,
-                    [
-                        buname, bco, sdate_dt, now,
-                        stock_val, qty_int, qty_int,
-                        0, 0,
-                    ],
-                )
-    finally:
-        closedb(conn)
-
-
-# -----------------------------------------------------
-# SAUCE 재계산 (PRODUCTION_PLAN 사용)
-# -----------------------------------------------------
-def recalc_dashboard_sauce_keep_manual(qdate):
-    if isinstance(qdate, str):
-        sdate_str = qdate
-        sdate_dt = datetime.strptime(qdate, "%Y-%m-%d")
-    else:
-        sdate_str = qdate.toString("yyyy-MM-dd")
-        sdate_dt = datetime(qdate.year(), qdate.month(), qdate.day(), 0, 0, 0)
-    now = datetime.now()
+                for k in [k for k in self._rows if k[0] == sdate_str]:
+                    del self._rows[k]
 
-    conn, cur = getdb(DB_NAME)
-    try:
-        sql = """
-            SELECT co, order_qty_after, production_plan,
-                   prev_residue, pkg
-            FROM ORDER_DASHBOARD
-            WHERE CONVERT(DATE, sdate) = %s
-        """
-        df_order = runquery(cur, sql, [sdate_str])
-    finally:
-        closedb(conn)
-
-    if df_order is None or df_order.empty:
-        return
-
-    df_order.columns = [c.upper() for c in df_order.columns]
-    df_order["CO"] = df_order["CO"].astype(str).str.strip()
-
-    grouped = calc_plan_kg_by_recipe(df_order, "소스")
-    if grouped is None or grouped.empty:
-        return
-
-    valid_keys = {
-        (str(r.BCO).strip(), str(r.BUNAME).strip())
-        for r in grouped.itertuples(index=False)
-    }
-
-    conn, cur = getdb(DB_NAME)
-    try:
-        sql = """
-            SELECT PK, uname, co
-            FROM DASHBOARD_SAUCE
-            WHERE CONVERT(DATE, sdate) = %s
-        """
-        df_exist = runquery(cur, sql, [sdate_str])
-    finally:
-        closedb(conn)
 
-    exist_map = {}
-    if df_exist is not None and not df_exist.empty:
-        df_exist.columns = [c.upper() for c in df_exist.columns]
-        for r in df_exist.itertuples(index=False):
-            exist_map[(str(r.CO).strip(), str(r.UNAME).strip())] = r
+stock_cache = StockCache()
 
-    # DELETE
-    delete_keys = set(exist_map.keys()) - valid_keys
-    if delete_keys:
-        conn, cur = getdb(DB_NAME)
-        try:
-            for co, uname in delete_keys:
-                runquery(
-                    cur,
-                    """
-                    DELETE FROM DASHBOARD_SAUCE
-                    WHERE CO=%s AND UNAME=%s
-                      AND CONVERT(DATE, sdate)=%s
-                    """,
-                    [co, uname, sdate_str],
-                )
-        finally:
-            closedb(conn)
 
-    # UPDATE / INSERT
-    conn, cur = getdb(DB_NAME)
-    try:
-        for r in grouped.itertuples(index=False):
-            bco = str(r.BCO).strip()
-            buname = str(r.BUNAME).strip()
-            qty_int = int(round(float(r.PLAN_KG or 0)))
+def get_stock_batch(bcos, sdate_str: str) -> dict:
+    """{bco: 재고 box} — 없는 BCO 는 0"""
+    return stock_cache.get_many(bcos, sdate_str)
 
-            key = (bco, buname)
-            exist = exist_map.get(key)
 
-            if exist:
-                sql_up = """
-                    UPDATE DASHBOARD_SAUCE
-                    SET order_qty_after = %s
-                    WHERE PK = %s
-                """
-                runquery(cur, sql_up, [qty_int, exist.PK])
-            else:
-                stock_val = get_stock_from_pan(bco, sdate_str)
-                sql_in = """
-                    INSERT INTO DASHBOARD_SAUCE (
-                        uname, co, sdate, created_time,
-                        stock, order_qty, order_qty_after,
-                        prepro_qty, ipgo_qty
-                    )
-                    VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s)
-                """
-                runquery(
-                    cur,
-                    sql_in,
-                    [
-                        buname, bco, sdate_dt, now,
-                        stock_val, qty_int, qty_int,
-                        0, 0,
-                    ],
-                )
-    finally:
-        closedb(conn)
+def get_stock_from_pan(bco: str, sdate_str: str) -> int:
+    return get_stock_batch([bco], sdate_str).get(str(bco).strip(), 0)
 
 
 # -----------------------------------------------------
-# VEGE 재계산 (PRODUCTION_PLAN 사용)
+# 벤더별 최종 발주팩 계산 (logic/vendor_rules.json 규칙표)
 # -----------------------------------------------------
-def recalc_dashboard_vege_keep_manual(qdate):
-    if isinstance(qdate, str):
-        sdate_str = qdate
-        sdate_dt = datetime.strptime(qdate, "%Y-%m-%d")
-    else:
-        sdate_str = qdate.toString("yyyy-MM-dd")
-        sdate_dt = datetime(qdate.year(), qdate.month(), qdate.day(), 0, 0, 0)
-    now = datetime.now()
-
-    VEGE_BCO_LIST = ["720192", "700122", "720094"]
-
-    conn, cur = getdb(DB_NAME)
-    try:
-        sql = """
-            SELECT co, order_qty_after, production_plan,
-                   prev_residue, pkg
-            FROM ORDER_DASHBOARD
-            WHERE CONVERT(DATE, sdate) = %s
-        """
-        df_order = runquery(cur, sql, [sdate_str])
-    finally:
-        closedb(conn)
-
-    if df_order is None or df_order.empty:
-        return
-
-    df_order.columns = [c.upper() for c in df_order.columns]
-    df_order["CO"] = df_order["CO"].astype(str).str.strip()
-
-    co_list = df_order["CO"].unique().tolist()
-    if not co_list:
-        return
-
-    # RECIPE 조회 (야채만)
-    conn, cur = getdb("GFOOD_B")
-    try:
-        sql = f"""
-            SELECT CO, BCO, BUNAME, SA
-            FROM RECIPE
-            WHERE BCO IN ({','.join(['%s']*len(VEGE_BCO_LIST))})
-              AND CO IN ({','.join(['%s']*len(co_list))})
-        """
-        params = VEGE_BCO_LIST + co_list
-        df_recipe = runquery(cur, sql, params)
-    finally:
-        closedb(conn)
+ORDER_FETCH_WORKERS = 6     # 원천 동시 조회 스레드 수 (워커당 풀 연결 1개)
 
-    if df_recipe is None or df_recipe.empty:
-        return
+# 호출마다 스레드를 새로 띄우지 않도록 모듈 공용 풀 — 작업은 DB 조회 하나씩이라 서로 기다리지 않는다
+_order_pool = ThreadPoolExecutor(max_workers=ORDER_FETCH_WORKERS, thread_name_prefix="order-fetch")
 
-    df_recipe.columns = [c.upper() for c in df_recipe.columns]
-    df_recipe["CO"] = df_recipe["CO"].astype(str)
-    df_recipe["BCO"] = df_recipe["BCO"].astype(str)
 
-    df = df_order.merge(df_recipe, on="CO", how="inner")
-    if df.empty:
-        return
+def _run_planned_query(query, fresh: bool = False) -> dict:
+    src = query.source
+    params = query.params()
+    if src.cached and not fresh:
+        df = cached_statement(src.db, src.statement, **params)
+    else:
+        with db_connection(src.db) as (conn, cur):
+            df = run_statement(cur, src.statement, **params)
+    result = query.collect(df)
+    if trace_enabled("order"):
+        trace("order", "source", source=src.name, params=params, rows=len(result))
+    return result
 
-    # PRE_PRODUCTION_QTY 대신 PRODUCTION_PLAN 사용
-    for col in ("PRODUCTION_PLAN", "PKG"):
-        if col not in df.columns:
-            df[col] = 0
 
-    df["PRODUCTION_PLAN"] = df["PRODUCTION_PLAN"].fillna(0).astype(float)
-    df["PKG"] = df["PKG"].fillna(0).astype(float)
+def _run_watermark_query(query) -> dict:
+    with db_connection(query.source.db) as (conn, cur):
+        df = run_statement(cur, query.source.watermark, **query.params())
+    return query.collect_watermarks(df)
 
-    # PLAN_KG = PRODUCTION_PLAN * PKG
-    df["PLAN_KG"] = df["PRODUCTION_PLAN"] * df["PKG"]
 
-    df = df[df["PLAN_KG"] > 0]
-    if df.empty:
-        return
+def fetch_source_watermarks(plan, keys: dict = None) -> tuple:
+    """
+    계획이 쓰는 원천 키·날짜별 변경 감지 값 → ({(source, 'yyyy-MM-dd'): {key: (행 수, 체크섬)}}, {source: 키 집합})
+    원천당 한 번, 공용 스레드 풀에서 동시에. 결과를 비교하려면 발주량 조회보다 먼저 읽어야 한다.
+    """
+    queries = plan.watermark_queries(keys)
+    watermarks = {}
+    if len(queries) == 1:
+        watermarks.update(_run_watermark_query(next(iter(queries.values()))))
+    elif queries:
+        for got in _order_pool.map(_run_watermark_query, queries.values()):
+            watermarks.update(got)
+    return watermarks, {name: frozenset(q.keys) for name, q in queries.items()}
 
-    df["VEGE_KG"] = df["PLAN_KG"] * df["SA"].fillna(0).astype(float)
-    df = df[df["VEGE_KG"] > 0]
-    if df.empty:
-        return
 
-    grouped = df.groupby(["BCO", "BUNAME"], as_index=False)["VEGE_KG"].sum()
+def calc_order_qty_packs(base_co: str, vendor: str, sdate_str: str, pacsu: int,
+                         dates_override: list = None) -> int:
+    base_co = str(base_co).strip()
+    pacsu_map = {base_co: pacsu if pacsu and pacsu > 0 else 1}
+    return calc_order_qty_packs_batch([(base_co, vendor)], sdate_str, pacsu_map,
+                                      dates_override).get(base_co, 0)
 
-    valid_keys = {(str(r["BCO"]).strip(), str(r["BUNAME"]).strip())
-                  for _, r in grouped.iterrows()}
 
-    # 기존 VEGE 조회
-    conn, cur = getdb(DB_NAME)
-    try:
-        sql = """
-            SELECT PK, uname, co
-            FROM DASHBOARD_VEGE
-            WHERE CONVERT(DATE, sdate) = %s
-        """
-        df_exist = runquery(cur, sql, [sdate_str])
-    finally:
-        closedb(conn)
+def execute_order_plan(plan, pacsu_map: dict = None, fresh: bool = False) -> dict:
+    """
+    계획의 원천 조회와 PACSU 로딩을 공용 스레드 풀에서 동시에 → {sdate: {co: 발주팩}}
+    할 일이 하나뿐이면(원천 1개, PACSU 불필요) 풀을 거치지 않고 바로 실행한다.
+    fresh=True 이면 cached 원천도 캐시를 거치지 않는다 (변경 감지 직후 재계산용)
+    """
+    if not plan.queries:
+        return plan.evaluate({}, {})
 
-    exist_map = {}
-    if df_exist is not None and not df_exist.empty:
-        df_exist.columns = [c.upper() for c in df_exist.columns]
-        for r in df_exist.itertuples(index=False):
-            exist_map[(str(r.CO).strip(), str(r.UNAME).strip())] = r
+    needs_pacsu = plan.needs_pacsu() if pacsu_map is None else []
+    if len(plan.queries) == 1 and not needs_pacsu:
+        results = {qid: _run_planned_query(q, fresh) for qid, q in plan.queries.items()}
+        return plan.evaluate(results, pacsu_map or {})
 
-    # DELETE
-    delete_keys = set(exist_map.keys()) - valid_keys
-    if delete_keys:
-        conn, cur = getdb(DB_NAME)
-        try:
-            for co, uname in delete_keys:
-                runquery(
-                    cur,
-                    """
-                    DELETE FROM DASHBOARD_VEGE
-                    WHERE CO=%s AND UNAME=%s
-                      AND CONVERT(DATE, sdate)=%s
-                    """,
-                    [co, uname, sdate_str],
-                )
-        finally:
-            closedb(conn)
+    pacsu_future = _order_pool.submit(master_index.pacsu_map, needs_pacsu) if needs_pacsu else None
+    futures = {qid: _order_pool.submit(_run_planned_query, q, fresh) for qid, q in plan.queries.items()}
 
-    # INSERT / UPDATE
-    conn, cur = getdb(DB_NAME)
-    try:
-        for _, r in grouped.iterrows():
-            bco = str(r["BCO"]).strip()
-            buname = str(r["BUNAME"]).strip()
-            qty_int = int(round(float(r["VEGE_KG"] or 0)))
+    pacsu_map = pacsu_future.result() if pacsu_future is not None else (pacsu_map or {})
+    results = {qid: f.result() for qid, f in futures.items()}
+    return plan.evaluate(results, pacsu_map)
 
-            key = (bco, buname)
-            exist = exist_map.get(key)
 
-            if exist:
-                sql = """
-                    UPDATE DASHBOARD_VEGE
-                    SET order_qty_after = %s
-                    WHERE PK = %s
-                """
-                runquery(cur, sql, [qty_int, exist.PK])
-            else:
-                stock_val = get_stock_from_pan(bco, sdate_str)
-                sql = """
-                    INSERT INTO DASHBOARD_VEGE (
-                        uname, co, sdate, created_time,
-                        stock, order_qty, order_qty_after,
-                        prepro_qty, ipgo_qty
-                    )
-                    VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s)
-                """
-                runquery(
-                    cur,
-                    sql,
-                    [
-                        buname, bco, sdate_dt, now,
-                        stock_val, qty_int, qty_int,
-                        0, 0,
-                    ],
-                )
-    finally:
-        closedb(conn)
+def calc_order_qty_packs_batch(products: list, sdate_str: str, pacsu_map: dict = None,
+                               dates_override: list = None) -> dict:
+    """
+    products: [(base_co, vendor), ...] → {base_co: 발주팩}
+    규칙표가 품목별 원천/조회일을 정하고, 같은 원천은 키와 날짜를 합쳐 한 번만 조회한다.
+    원천 조회와 PACSU 로딩은 스레드 풀에서 동시에 (가장 느린 원천 시간만큼 걸림).
+    """
+    plan = get_vendor_rules().plan(products, sdate_str, dates_override)
+    return execute_order_plan(plan, pacsu_map).get(sdate_str, {})
 
 
 # -----------------------------------------------------
@@ -1078,16 +257,7 @@ def calc_trate_value(
         if co == "502415":
             conn, cur = getdb(DB_NAME)
             try:
-                df = runquery(
-                    cur,
-                    """
-                    SELECT ISNULL(SUM(order_qty_after), 0) AS qty
-                    FROM ORDER_DASHBOARD
-                    WHERE CONVERT(DATE, sdate) = %s
-                      AND co = %s
-                    """,
-                    [sdate_str, "511540"],
-                )
+                df = run_statement(cur, "order.sum_qty_after_by_co", sdate=sdate_str, co="511540")
                 other_qty = int(df.iloc[0]["qty"]) if df is not None and not df.empty else 0
             finally:
                 closedb(conn)
@@ -0,0 +1,257 @@
+# master_data.py
+# -----------------------------------------------------
+# GFOOD_B.MASTER 품목 정보(PACSU/PACKG/UNAME/TCO) 세션 인덱스 + CO↔TCO 변환 인덱스
+# CO 를 하나씩 조회하던 get_pacsu_by_co / _get_master_info / 더미행 생성의
+# MASTER 조회를 IN (...) 한 번으로 묶고, 읽은 값은 세션 동안 메모리에 유지한다.
+# -----------------------------------------------------
+
+import threading
+import time
+from typing import Optional
+
+import pandas as pd
+
+from UTIL.db_handler import db_connection, runquery
+from UTIL.sql_registry import run_statement
+
+MASTER_LOAD_CHUNK = 1000    # IN 목록 한 번에 보내는 CO 수 (레지스트리 최대 버킷 이하)
+MASTER_MISS_TTL_SEC = 300   # MASTER 에 없던 CO 를 다시 조회하기까지의 시간 (나중에 등록된 품목 대비)
+
+
+def _text(raw) -> str:
+    return "" if raw is None or pd.isna(raw) else str(raw).strip()
+
+
+def parse_pacsu(raw) -> int:
+    """PACSU → 양의 정수 (없거나 0 이하면 1)"""
+    try:
+        pacsu = int(raw if _text(raw) else 1)
+    except (TypeError, ValueError):
+        return 1
+    return pacsu if pacsu > 0 else 1
+
+
+def parse_packg(raw) -> float:
+    """PACKG → kg (float). '2.5KG' 처럼 단위가 붙은 값도 처리, 실패하면 0.0"""
+    if not _text(raw):
+        return 0.0
+    try:
+        return float(raw)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return float(str(raw).upper().replace("KG", "").strip())
+    except ValueError:
+        return 0.0
+
+
+class MasterIndex:
+    """
+    {co: {"CO", "UNAME", "PACSU", "PACKG", "TCO"}} 인덱스.
+    MASTER 에 없는 CO 도 None 으로 기억해서 miss_ttl 동안은 다시 조회하지 않는다.
+    """
+
+    def __init__(self, miss_ttl: float = MASTER_MISS_TTL_SEC):
+        self.miss_ttl = miss_ttl
+        self._rows = {}
+        self._missed = {}       # {co: 없음으로 기억한 시각}
+        self._lock = threading.Lock()
+        self.queries = 0
+
+    def _stale(self, co: str, now: float) -> bool:
+        if co not in self._rows:
+            return True
+        return self._rows[co] is None and now - self._missed.get(co, 0) >= self.miss_ttl
+
+    def load(self, cos, cur: object = None) -> dict:
+        """아직 인덱스에 없는 CO 만 모아 조회. cur 는 GFOOD_B 커서(없으면 새로 빌림)"""
+        cos = {str(c).strip() for c in cos if c is not None and str(c).strip()}
+        now = time.monotonic()
+        with self._lock:
+            missing = sorted(co for co in cos if self._stale(co, now))
+
+        if missing:
+            if cur is None:
+                with db_connection("GFOOD_B") as (conn, cur):
+                    loaded = self._fetch(cur, missing)
+            else:
+                loaded = self._fetch(cur, missing)
+            with self._lock:
+                for co in missing:
+                    self._rows[co] = loaded.get(co)
+                    if self._rows[co] is None:
+                        self._missed[co] = now
+                    else:
+                        self._missed.pop(co, None)
+
+        with self._lock:
+            return {co: self._rows.get(co) for co in cos}
+
+    def _fetch(self, cur: object, cos: list) -> dict:
+        result = {}
+        for i in range(0, len(cos), MASTER_LOAD_CHUNK):
+            df = run_statement(cur, "master.info_by_cos", cos=cos[i:i + MASTER_LOAD_CHUNK])
+            self.queries += 1
+            if df is None or df.empty:
+                continue
+            for row in df.itertuples(index=False):
+                co = str(row.CO).strip()
+                if co in result:
+                    continue
+                result[co] = {
+                    "CO": co,
+                    "UNAME": _text(row.UNAME),
+                    "PACSU": parse_pacsu(row.PACSU),
+                    "PACKG": parse_packg(row.PACKG),
+                    "TCO": _text(row.TCO),
+                }
+        return result
+
+    def get(self, co: str, cur: object = None) -> Optional[dict]:
+        co = str(co).strip()
+        return self.load([co], cur).get(co)
+
+    def pacsu(self, co: str) -> int:
+        rec = self.get(co)
+        return rec["PACSU"] if rec else 1
+
+    def packg(self, co: str) -> float:
+        rec = self.get(co)
+        return rec["PACKG"] if rec else 0.0
+
+    def pacsu_map(self, cos, cur: object = None) -> dict:
+        """{co: pacsu} — MASTER 에 없는 CO 는 1"""
+        return {co: (rec["PACSU"] if rec else 1) for co, rec in self.load(cos, cur).items()}
+
+    def invalidate(self, cos=None) -> None:
+        """cos=None 이면 전체 비움 (MASTER/품목 구성 수정 후 호출)"""
+        with self._lock:
+            if cos is None:
+                self._rows.clear()
+                self._missed.clear()
+            else:
+                for co in cos:
+                    self._rows.pop(str(co).strip(), None)
+                    self._missed.pop(str(co).strip(), None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            found = sum(1 for v in self._rows.values() if v is not None)
+            return {"entries": len(self._rows), "found": found, "queries": self.queries}
+
+
+master_index = MasterIndex()
+
+
+# -----------------------------------------------------
+# CO ↔ TCO 변환 인덱스
+#   GFOOD_B.MMASTER : CO → TCO, TCO → CO (이마트/컬리)
+#   GWCHUL.MASTER   : CO → TCO3 (코스온 LCODE)
+# 업체별 수량 계산마다 먼저 돌던 TOP 1 키 조회를 없애기 위해 테이블 전체를
+# 한 번 읽어 두고 TTL 이 지나면 다시 읽는다. 다시 읽기는 원천별로 한 스레드만 하고
+# (나머지는 기다렸다가 그 결과를 사용), 날짜 이동 미리 조회(order_prefetch)가 warm() 으로 미리 채운다.
+# -----------------------------------------------------
+CODE_INDEX_TTL_SEC = 600
+
+CODE_SOURCES = {
+    # 이름: (DB, SQL) — 결과 1열 CO, 2열 대상 코드. 코드가 있는 행만, CO·코드 순으로 정렬
+    "MMASTER": ("GFOOD_B",
+                "SELECT CO, TCO FROM MMASTER WHERE TCO IS NOT NULL AND LTRIM(RTRIM(TCO)) <> '' "
+                "ORDER BY CO, TCO"),
+    "MASTER_TCO3": ("GWCHUL",
+                    "SELECT CO, TCO3 FROM MASTER WHERE TCO3 IS NOT NULL AND LTRIM(RTRIM(TCO3)) <> '' "
+                    "ORDER BY CO, TCO3"),
+}
+
+
+class CodeIndex:
+
+    def __init__(self, ttl: float = CODE_INDEX_TTL_SEC):
+        self.ttl = ttl
+        self._maps = {}         # {source: {"fwd": {co: code}, "rev": {code: co}, "loaded": ts}}
+        self._lock = threading.Lock()
+        self._load_locks = {source: threading.Lock() for source in CODE_SOURCES}
+        self.loads = 0
+
+    def _fresh(self, source: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._maps.get(source)
+        if entry is not None and time.monotonic() - entry["loaded"] < self.ttl:
+            return entry
+        return None
+
+    def _get(self, source: str) -> dict:
+        entry = self._fresh(source)
+        if entry is not None:
+            return entry
+
+        with self._load_locks[source]:
+            entry = self._fresh(source)     # 기다리는 동안 다른 스레드가 읽었으면 그대로 사용
+            if entry is not None:
+                return entry
+            with self._lock:
+                entry = self._maps.get(source)
+            try:
+                fresh = self._load(source)
+            except Exception as e:
+                if entry is None:
+                    raise
+                print(f"[CodeIndex] {source} 갱신 실패, 이전 값 사용: {e}")
+                return entry
+
+            with self._lock:
+                self._maps[source] = fresh
+            return fresh
+
+    def warm(self) -> None:
+        """없거나 TTL 이 지난 원천을 미리 읽는다 (백그라운드 스레드에서 호출)"""
+        for source in CODE_SOURCES:
+            self._get(source)
+
+    def _load(self, source: str) -> dict:
+        db_name, sql = CODE_SOURCES[source]
+        with db_connection(db_name) as (conn, cur):
+            df = runquery(cur, sql)
+        self.loads += 1
+
+        # 같은 키가 여러 행이면 정렬 순서상 첫 행 (CO → 가장 작은 코드, 코드 → 가장 작은 CO)
+        fwd, rev = {}, {}
+        if df is not None and not df.empty:
+            for co, code in zip(df.iloc[:, 0], df.iloc[:, 1]):
+                co, code = _text(co), _text(code)
+                if not co or not code:
+                    continue
+                fwd.setdefault(co, code)
+                rev.setdefault(code, co)
+        return {"fwd": fwd, "rev": rev, "loaded": time.monotonic()}
+
+    def co_to_tco(self, co: str) -> str:
+        """MMASTER CO → TCO (없으면 '')"""
+        return self._get("MMASTER")["fwd"].get(_text(co), "")
+
+    def tco_to_co(self, tco: str) -> str:
+        """MMASTER TCO → CO (없으면 '')"""
+        return self._get("MMASTER")["rev"].get(_text(tco), "")
+
+    def co_to_tco3(self, co: str) -> str:
+        """GWCHUL.MASTER CO → TCO3 (없으면 '')"""
+        return self._get("MASTER_TCO3")["fwd"].get(_text(co), "")
+
+    def invalidate(self, source: Optional[str] = None) -> None:
+        with self._lock:
+            if source is None:
+                self._maps.clear()
+            else:
+                self._maps.pop(source, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "loads": self.loads,
+                "sources": {name: {"entries": len(m["fwd"]), "age_sec": round(now - m["loaded"], 1)}
+                            for name, m in self._maps.items()},
+            }
+
+
+code_index = CodeIndex()
@@ -0,0 +1,308 @@
+# material_bom.py
+# -----------------------------------------------------
+# ORDER_DASHBOARD 생산계획 → 원료(RAW) / 소스(SAUCE) / 야채(VEGE) 소요량 공통 엔진
+#   주문 1회 조회 + 세션 RECIPE 인덱스 → 한 번의 merge 로 세 자재를 같이 전개하고,
+#   결과(BCO, BUNAME, KG)는 공통 writer 가 각 DASHBOARD_* 테이블에 반영한다.
+# -----------------------------------------------------
+
+import threading
+from datetime import date, datetime
+
+import pandas as pd
+
+from UTIL.db_handler import _as_date, bulk_insert, db_connection, runquery, transaction
+from UTIL.sql_registry import MATERIAL_STAGE, rows_chunk_size, run_statement
+from logic.cal_values import get_stock_batch
+
+DB_NAME = "GP"
+
+# 자재별 전개 규칙 — KG = PRODUCTION_PLAN × PKG × SA × sa_scale (SA 가 없으면 sa_default)
+#   keyword: RECIPE.BUNAME 포함 문자열, bcos: 항상 포함할 BCO
+MATERIALS = {
+    "raw": {"table": "DASHBOARD_RAW", "keyword": "(정선)", "bcos": ("502811",),
+            "sa_scale": 0.01, "sa_default": 1.0},
+    "sauce": {"table": "DASHBOARD_SAUCE", "keyword": "소스", "bcos": ("600901",),
+              "sa_scale": 0.01, "sa_default": 1.0},
+    "vege": {"table": "DASHBOARD_VEGE", "keyword": None, "bcos": ("720192", "700122", "720094", "710665"),
+             "sa_scale": 1.0, "sa_default": 0.0},
+}
+MATERIAL_COLUMNS = [
+    "uname", "co", "sdate", "created_time",
+    "stock", "order_qty", "order_qty_after",
+    "prepro_qty", "ipgo_qty",
+]
+
+
+def _sdate(qdate) -> tuple:
+    """QDate / 'yyyy-MM-dd' → ('yyyy-MM-dd', datetime 자정)"""
+    d = _as_date(qdate)
+    return d.strftime("%Y-%m-%d"), datetime(d.year, d.month, d.day)
+
+
+def load_orders(sdate_str: str) -> pd.DataFrame:
+    with db_connection(DB_NAME) as (conn, cur):
+        df = run_statement(cur, "order.by_date", sdate=sdate_str)
+    if df is None or df.empty:
+        return pd.DataFrame()
+    df.columns = [c.upper() for c in df.columns]
+    df["CO"] = df["CO"].astype(str).str.strip()
+    return df
+
+
+RECIPE_COLUMNS = ["CO", "BCO", "BUNAME", "SA"] + list(MATERIALS)
+RECIPE_LOAD_CHUNK = 1000
+
+
+def _recipe_frame(df) -> pd.DataFrame:
+    """RECIPE 조회 결과 → 세 자재 중 하나에라도 해당하는 행 + 자재별 마스크 열(raw/sauce/vege)"""
+    if df is None or df.empty:
+        return pd.DataFrame(columns=RECIPE_COLUMNS)
+    df = df.copy()
+    df.columns = [c.upper() for c in df.columns]
+    for col in ("CO", "BCO", "BUNAME"):
+        df[col] = df[col].astype(str).str.strip()
+    df["SA"] = pd.to_numeric(df["SA"], errors="coerce")
+
+    any_mask = pd.Series(False, index=df.index)
+    for key, m in MATERIALS.items():
+        mask = df["BCO"].isin(m["bcos"])
+        if m["keyword"]:
+            mask |= df["BUNAME"].str.contains(m["keyword"], regex=False)
+        df[key] = mask
+        any_mask |= mask
+    return df.loc[any_mask, RECIPE_COLUMNS].reset_index(drop=True)
+
+
+class RecipeIndex:
+    """
+    세션 RECIPE 인덱스 — CO 별 자재 레시피 행 (BCO, BUNAME, SA, 자재 마스크).
+    처음 보는 CO 만 IN (...) 으로 읽고(레시피가 없는 CO 도 기억), 날짜가 바뀌면 비운다.
+    재계산이 반복돼도 같은 날 읽은 CO 는 SQL 없이 메모리에서 바로 전개한다.
+    """
+
+    def __init__(self):
+        self._frame = pd.DataFrame(columns=RECIPE_COLUMNS)
+        self._loaded = set()
+        self._day = date.today()
+        self._lock = threading.Lock()
+        self.queries = 0
+
+    def rows(self, cos) -> pd.DataFrame:
+        cos = {str(c).strip() for c in cos if c is not None and str(c).strip()}
+        with self._lock:
+            if self._day != date.today():
+                self._clear()
+            missing = sorted(cos - self._loaded)
+
+        if missing:
+            parts = []
+            with db_connection("GFOOD_B") as (conn, cur):
+                for i in range(0, len(missing), RECIPE_LOAD_CHUNK):
+                    parts.append(_recipe_frame(run_statement(cur, "recipe.by_cos",
+                                                             cos=missing[i:i + RECIPE_LOAD_CHUNK])))
+                    self.queries += 1
+            with self._lock:
+                fresh = [p for p in parts if not p.empty]
+                if fresh:
+                    base = [self._frame] if not self._frame.empty else []
+                    self._frame = pd.concat(base + fresh, ignore_index=True)
+                self._loaded.update(missing)
+
+        with self._lock:
+            return self._frame[self._frame["CO"].isin(cos)].reset_index(drop=True)
+
+    def _clear(self) -> None:
+        self._frame = pd.DataFrame(columns=RECIPE_COLUMNS)
+        self._loaded = set()
+        self._day = date.today()
+
+    def invalidate(self) -> None:
+        """RECIPE 수정 후 호출"""
+        with self._lock:
+            self._clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"cos": len(self._loaded), "rows": len(self._frame), "queries": self.queries,
+                    "day": self._day.isoformat()}
+
+
+recipe_index = RecipeIndex()
+
+
+def load_recipe(cos: list) -> pd.DataFrame:
+    """세 자재 중 하나에라도 해당하는 RECIPE 행 (recipe_index 에서)"""
+    return recipe_index.rows(cos)
+
+
+def explode(df_order: pd.DataFrame, df_recipe: pd.DataFrame) -> dict:
+    """
+    생산계획 × 레시피 전개 → {자재 키: DataFrame[BCO, BUNAME, KG]} (KG > 0 인 행만)
+    df_recipe 는 load_recipe() 결과. merge 는 한 번, 자재별 차이는 마스크 열과 SA 배율로만 처리한다.
+    """
+    empty = pd.DataFrame(columns=["BCO", "BUNAME", "KG"])
+    if df_order is None or df_order.empty or df_recipe is None or df_recipe.empty:
+        return {key: empty for key in MATERIALS}
+
+    orders = df_order[["CO"]].copy()
+    for col in ("PRODUCTION_PLAN", "PKG"):
+        orders[col] = pd.to_numeric(df_order[col], errors="coerce").fillna(0).astype(float) \
+            if col in df_order.columns else 0.0
+
+    df = orders.merge(df_recipe, on="CO", how="inner")
+    base = df["PRODUCTION_PLAN"] * df["PKG"]
+    sa = pd.to_numeric(df["SA"], errors="coerce")
+
+    result = {}
+    for key, m in MATERIALS.items():
+        mask = df[key].astype(bool)
+        kg = base * sa.fillna(m["sa_default"]) * m["sa_scale"]
+        part = df.loc[mask & (kg > 0), ["BCO", "BUNAME"]].assign(KG=kg[mask & (kg > 0)])
+        result[key] = part.groupby(["BCO", "BUNAME"], as_index=False)["KG"].sum() if not part.empty else empty
+    return result
+
+
+def _qty(kg) -> int:
+    """전개 KG → 자재 행 수량 (반올림). 0 이하이면 행을 두지 않는다 — 전체/단건 반영 공통 규칙"""
+    return int(round(float(kg or 0)))
+
+
+def _new_row(bco: str, buname: str, qty: int, stock: int, sdate_dt, now) -> dict:
+    return {
+        "uname": buname, "co": bco, "sdate": sdate_dt, "created_time": now,
+        "stock": stock,
+        "order_qty": qty, "order_qty_after": qty,
+        "prepro_qty": 0, "ipgo_qty": 0,
+    }
+
+
+def write_material_diff(cur, key: str, grouped: pd.DataFrame, sdate_str: str, sdate_dt) -> None:
+    """
+    수기 입력(stock/prepro_qty/ipgo_qty)은 보존하는 반영 — 테이블당 MERGE 한 번:
+    사라진 (BCO, BUNAME) 삭제, 있는 행은 order_qty_after 만 갱신, 새 행은 INSERT
+    """
+    stmt = MATERIALS[key]["table"].lower()
+    df_exist = run_statement(cur, f"{stmt}.keys_by_date", sdate=sdate_str)
+    exist = set()
+    if df_exist is not None and not df_exist.empty:
+        df_exist.columns = [c.upper() for c in df_exist.columns]
+        exist = {(str(co).strip(), str(uname).strip()) for co, uname in zip(df_exist["CO"], df_exist["UNAME"])}
+
+    # 반올림 수량이 0 이하인 행은 결과에서 빼서 MERGE 가 지우게 한다
+    # 재고는 새로 들어갈 행만 한 번에 조회 (기존 행은 수기 입력값 유지)
+    keys = [(bco, buname, _qty(kg)) for bco, buname, kg in zip(grouped["BCO"], grouped["BUNAME"], grouped["KG"])
+            if _qty(kg) > 0]
+    stocks = get_stock_batch([bco for bco, buname, _ in keys if (bco, buname) not in exist], sdate_str)
+    rows = []
+    for bco, buname, qty in keys:
+        stock = None if (bco, buname) in exist else stocks.get(bco, 0)
+        rows.append((bco, buname, qty, stock))
+
+    if len(rows) <= rows_chunk_size(f"{stmt}.merge_rows"):
+        run_statement(cur, f"{stmt}.merge_rows", sdate=sdate_str, now=datetime.now(), rows=rows)
+        return
+
+    # 행이 많으면 임시 테이블에 쌓고 같은 MERGE 를 한 번
+    runquery(cur, f"""
+        IF OBJECT_ID('tempdb..{MATERIAL_STAGE}') IS NOT NULL DROP TABLE {MATERIAL_STAGE};
+        CREATE TABLE {MATERIAL_STAGE} (co VARCHAR(50), uname NVARCHAR(200), qty INT, stock INT);
+    """)
+    bulk_insert(cur, MATERIAL_STAGE, ["co", "uname", "qty", "stock"], rows)
+    run_statement(cur, f"{stmt}.merge_stage", sdate=sdate_str, now=datetime.now())
+    runquery(cur, f"DROP TABLE {MATERIAL_STAGE}")
+
+
+def replace_material_rows(cur, key: str, grouped: pd.DataFrame, sdate_str: str, sdate_dt) -> None:
+    """해당 날짜 행을 모두 지우고 다시 만든다 (수량 0 이하는 제외)"""
+    table = MATERIALS[key]["table"]
+    now = datetime.now()
+    run_statement(cur, f"{table.lower()}.delete_by_date", sdate=sdate_str)
+    stocks = get_stock_batch(grouped["BCO"].tolist(), sdate_str) if not grouped.empty else {}
+    rows = []
+    for bco, buname, kg in zip(grouped["BCO"], grouped["BUNAME"], grouped["KG"]):
+        qty = _qty(kg)
+        if qty > 0:
+            rows.append(_new_row(bco, buname, qty, stocks.get(bco, 0), sdate_dt, now))
+    bulk_insert(cur, table, MATERIAL_COLUMNS, rows)
+
+
+def recalc_materials_keep_manual(qdate) -> dict:
+    """
+    발주량 갱신/제품 삭제 후 재계산 — 세 자재 테이블을 한 트랜잭션으로 반영.
+    전개 결과가 없는 자재는 건드리지 않는다. 반환: {자재 키: 전개 행 수}
+    """
+    sdate_str, sdate_dt = _sdate(qdate)
+    df_order = load_orders(sdate_str)
+    if df_order.empty:
+        return {}
+
+    exploded = explode(df_order, load_recipe(df_order["CO"].unique().tolist()))
+    with db_connection(DB_NAME) as (conn, cur), transaction(conn):
+        for key, grouped in exploded.items():
+            if not grouped.empty:
+                write_material_diff(cur, key, grouped, sdate_str, sdate_dt)
+    return {key: len(grouped) for key, grouped in exploded.items()}
+
+
+def generate_materials(qdate) -> dict:
+    """제품 행 생성 직후 세 자재 테이블을 새로 만든다 (수기 입력 없음)"""
+    sdate_str, sdate_dt = _sdate(qdate)
+    df_order = load_orders(sdate_str)
+    if df_order.empty:
+        exploded = explode(df_order, None)
+    else:
+        exploded = explode(df_order, load_recipe(df_order["CO"].unique().tolist()))
+
+    with db_connection(DB_NAME) as (conn, cur), transaction(conn):
+        for key, grouped in exploded.items():
+            replace_material_rows(cur, key, grouped, sdate_str, sdate_dt)
+    return {key: len(grouped) for key, grouped in exploded.items()}
+
+
+def recalc_materials_for_co(qdate, co: str) -> dict:
+    """
+    생산계획 단건 수정 반영 — 그 CO 의 레시피가 닿는 (BCO, BUNAME) 행만 다시 계산해서 MERGE.
+    ORDER_DASHBOARD 는 매번 다시 읽고(다른 사용자의 수정/삭제도 반영), 레시피는 recipe_index 에서
+    같은 자재를 쓰는 행만 골라 전개한다. 수량 규칙은 전체 재계산과 같다 (반올림 0 이하면 삭제).
+    반환: {자재 키: 반영 행 수}
+    """
+    sdate_str, sdate_dt = _sdate(qdate)
+    own = load_recipe([co])
+    targets = {key: set(zip(own.loc[own[key].astype(bool), "BCO"], own.loc[own[key].astype(bool), "BUNAME"]))
+               for key in MATERIALS} if not own.empty else {}
+    targets = {key: pairs for key, pairs in targets.items() if pairs}
+    if not targets:
+        return {}
+
+    df_order = load_orders(sdate_str)
+    if df_order.empty:
+        exploded = explode(df_order, None)
+    else:
+        recipe = load_recipe(df_order["CO"].unique().tolist())
+        touched = set().union(*targets.values())
+        recipe = recipe.loc[pd.MultiIndex.from_arrays([recipe["BCO"], recipe["BUNAME"]]).isin(list(touched))]
+        exploded = explode(df_order, recipe)
+
+    changes = {}        # {자재 키: [(BCO, BUNAME, 수량 또는 None=삭제)]}
+    for key, pairs in targets.items():
+        grouped = exploded[key]
+        kg = dict(zip(zip(grouped["BCO"], grouped["BUNAME"]), grouped["KG"]))
+        rows = []
+        for bco, buname in sorted(pairs):
+            qty = _qty(kg.get((bco, buname)))
+            rows.append((bco, buname, qty if qty > 0 else None))
+        changes[key] = rows
+
+    # 재고는 INSERT 될 때만 쓰인다 (MERGE 가 기존 행의 수기 입력값은 건드리지 않음)
+    stocks = get_stock_batch([bco for rows in changes.values() for bco, _, qty in rows if qty is not None],
+                             sdate_str)
+    now = datetime.now()
+    with db_connection(DB_NAME) as (conn, cur), transaction(conn):
+        for key, rows in changes.items():
+            stmt = f"{MATERIALS[key]['table'].lower()}.apply_rows"
+            values = [(bco, buname, qty, stocks.get(bco, 0) if qty is not None else None)
+                      for bco, buname, qty in rows]
+            size = rows_chunk_size(stmt)
+            for i in range(0, len(values), size):
+                run_statement(cur, stmt, sdate=sdate_str, now=now, rows=values[i:i + size])
+    return {key: len(rows) for key, rows in changes.items()}
@@ -0,0 +1,201 @@
+# order_prefetch.py
+# -----------------------------------------------------
+# 날짜 이동(btn_prev / btn_next / dateEdit)용 발주량 미리 계산
+#   기준일 주변 창(어제, 오늘, 내일, 다가오는 토·일)을 한 조회 계획(plan_dates)으로
+#   원천당 한 번씩 조회해서 날짜별 캐시에 넣어 두고, 발주량 갱신/더미행 생성은
+#   캐시가 신선하면 조회 없이 바로 쓴다.
+# 백그라운드 작업은 CO↔TCO 변환 인덱스(code_index)도 먼저 데워서 첫 계산이 GUI 스레드에서 읽지 않게 한다.
+# 캐시에는 조회 직전에 읽은 원천 키·날짜별 워터마크(행 수, CHECKSUM_AGG)도 같이 두고,
+# refresh() 는 자기 키의 워터마크가 움직인 품목만 다시 계산한다 (30분 자동 갱신/발주량 갱신 버튼).
+# -----------------------------------------------------
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from UTIL.db_handler import _as_date
+from UTIL.util import trace
+from logic.cal_values import execute_order_plan, fetch_source_watermarks
+from logic.master_data import code_index
+from logic.vendor_rules import get_vendor_rules
+
+PREFETCH_TTL_SEC = 120      # 캐시 신선도 (원천 데이터는 계속 들어오므로 짧게)
+PREFETCH_MAX_DATES = 21     # 날짜 캐시 최대 개수 (오래된 것부터 버림)
+PREFETCH_WAIT_SEC = 0.3     # 캐시가 없을 때 진행 중인 미리 조회를 기다리는 최대 시간 (GUI 스레드)
+
+
+def prefetch_window(sdate) -> list:
+    """기준일 → [어제, 오늘, 내일, 다가오는 토, 일] ('yyyy-MM-dd', 중복 제거)"""
+    base = _as_date(sdate)
+    days = [base - timedelta(days=1), base, base + timedelta(days=1)]
+    sat = base + timedelta(days=(5 - base.weekday()) % 7)
+    if base.weekday() == 6:
+        sat = base - timedelta(days=1)
+    days += [sat, sat + timedelta(days=1)]
+    return list(dict.fromkeys(d.strftime("%Y-%m-%d") for d in days))
+
+
+def _products_key(products) -> frozenset:
+    return frozenset((str(co).strip(), (vendor or "").strip()) for co, vendor in products if str(co).strip())
+
+
+class _Entry:
+    __slots__ = ("loaded", "covered", "qty", "watermarks", "keys")
+
+    def __init__(self, loaded, covered, qty, watermarks, keys):
+        self.loaded = loaded            # time.monotonic()
+        self.covered = covered          # 계산한 (co, vendor) 집합
+        self.qty = qty                  # {co: 발주팩}
+        self.watermarks = watermarks    # {(source, 'yyyy-MM-dd'): {key: (행 수, 체크섬)}} — 날짜마다 별도 사본
+        self.keys = keys                # {source: 워터마크 조회에 쓴 키 집합}
+
+
+class OrderPrefetcher:
+    """{sdate: _Entry} 날짜별 캐시"""
+
+    def __init__(self, ttl: float = PREFETCH_TTL_SEC, max_dates: int = PREFETCH_MAX_DATES):
+        self.ttl = ttl
+        self.max_dates = max_dates
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="order-prefetch")
+        self._pending = None
+        self.hits = 0
+        self.misses = 0
+        self.fetches = 0
+        self.refreshed = 0
+        self.skipped = 0
+
+    def _lookup(self, products_key: frozenset, sdate_str: str):
+        with self._lock:
+            entry = self._cache.get(sdate_str)
+            if entry is None:
+                return None
+            if time.monotonic() - entry.loaded >= self.ttl or not products_key <= entry.covered:
+                return None
+            self._cache.move_to_end(sdate_str)
+            return {co: entry.qty.get(co, 0) for co, _ in products_key}
+
+    def _store(self, products_key: frozenset, by_date: dict, watermarks: dict, keys: dict) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for sdate_str, qty in by_date.items():
+                self._cache[sdate_str] = _Entry(now, products_key, dict(qty), dict(watermarks), dict(keys))
+                self._cache.move_to_end(sdate_str)
+            while len(self._cache) > self.max_dates:
+                self._cache.popitem(last=False)
+
+    def fetch(self, products: list, sdates: list) -> dict:
+        """sdates 를 한 번에 조회해서 캐시에 넣고 {sdate: {co: 발주팩}} 반환"""
+        key = _products_key(products)
+        started = time.perf_counter()
+        plan = get_vendor_rules().plan_dates(sorted(key), sdates)
+        watermarks, wm_keys = fetch_source_watermarks(plan)       # 반드시 발주량 조회보다 먼저
+        by_date = execute_order_plan(plan, fresh=True)
+        by_date = {sdate: by_date.get(sdate, {}) for sdate in sdates}
+        self._store(key, by_date, watermarks, wm_keys)
+        self.fetches += 1
+        trace("prefetch", "fetch", dates=sdates, products=len(key),
+              ms=round((time.perf_counter() - started) * 1000, 1))
+        return by_date
+
+    def refresh(self, products: list, sdate) -> tuple:
+        """
+        입고일 발주팩을 최신으로 → ({co: 발주팩}, 다시 계산한 co 집합)
+        캐시가 있으면 원천 워터마크만 읽고, 자기 키·조회일의 값이 달라진 품목만 다시 조회한다.
+        캐시가 없으면 그 날짜 창 전체를 조회하고 모든 품목을 다시 계산한 것으로 본다.
+        """
+        sdate_str = _as_date(sdate).strftime("%Y-%m-%d")
+        key = _products_key(products)
+        with self._lock:
+            entry = self._cache.get(sdate_str)
+        if entry is None or not key <= entry.covered:
+            qty = self.fetch(products, prefetch_window(sdate_str)).get(sdate_str, {})
+            self.refreshed += len(qty)
+            return qty, set(qty)
+
+        rules = get_vendor_rules()
+        plan = rules.plan(sorted(key), sdate_str)
+        watermarks, wm_keys = fetch_source_watermarks(plan, entry.keys)
+        changed = plan.changed_cos(entry.watermarks, watermarks)
+
+        qty = {co: entry.qty.get(co, 0) for co, _ in key}
+        if changed:
+            sub = rules.plan(sorted(p for p in key if p[0] in changed), sdate_str)
+            qty.update(execute_order_plan(sub, fresh=True).get(sdate_str, {}))
+
+        with self._lock:
+            if self._cache.get(sdate_str) is entry:
+                entry.qty.update(qty)
+                entry.watermarks.update(watermarks)
+                entry.keys.update(wm_keys)
+                entry.loaded = time.monotonic()
+
+        self.refreshed += len(changed)
+        self.skipped += len(qty) - len(changed)
+        trace("prefetch", "refresh", sdate=sdate_str, changed=len(changed), skipped=len(qty) - len(changed))
+        return qty, changed
+
+    def quantities(self, products: list, sdate) -> dict:
+        """
+        입고일 발주팩 {co: 발주팩}. 캐시가 없거나 오래됐으면 진행 중인 미리 조회를 잠깐만 기다리고,
+        그래도 없으면 그 날짜 하나만 바로 조회한다 (창 전체를 기다리며 화면을 멈추지 않음)
+        """
+        sdate_str = _as_date(sdate).strftime("%Y-%m-%d")
+        key = _products_key(products)
+        cached = self._lookup(key, sdate_str)
+        if cached is not None:
+            self.hits += 1
+            trace("prefetch", "hit", sdate=sdate_str)
+            return cached
+
+        self.misses += 1
+        pending = self._pending
+        if pending is not None and not pending.done():
+            try:
+                pending.result(timeout=PREFETCH_WAIT_SEC)
+            except Exception:
+                pass                # 시간 초과/실패 — 아래에서 이 날짜만 조회
+            cached = self._lookup(key, sdate_str)
+            if cached is not None:
+                return cached
+
+        return self.fetch(products, [sdate_str]).get(sdate_str, {})
+
+    def prefetch_async(self, products: list, sdate) -> None:
+        """
+        날짜 이동 시 호출 — CO↔TCO 변환 인덱스를 데우고, 창 중 캐시에 없는 날짜만
+        백그라운드로 조회 (UI 는 건드리지 않음)
+        """
+        key = _products_key(products or [])
+        missing = [d for d in prefetch_window(sdate) if self._lookup(key, d) is None] if key else []
+        self._pending = self._pool.submit(self._prefetch_quietly, products, missing)
+
+    def _prefetch_quietly(self, products: list, sdates: list) -> None:
+        try:
+            code_index.warm()
+        except Exception as e:
+            print(f"[OrderPrefetcher] 코드 인덱스 미리 읽기 실패: {e}")
+        if not sdates:
+            return
+        try:
+            self.fetch(products, sdates)
+        except Exception as e:
+            print(f"[OrderPrefetcher] 미리 조회 실패 {sdates}: {e}")
+
+    def invalidate(self, sdate=None) -> None:
+        with self._lock:
+            if sdate is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(_as_date(sdate).strftime("%Y-%m-%d"), None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"dates": list(self._cache), "hits": self.hits, "misses": self.misses,
+                    "fetches": self.fetches, "refreshed": self.refreshed, "skipped": self.skipped}
+
+
+order_prefetch = OrderPrefetcher()
@@ -0,0 +1,298 @@
+# vendor_rules.py
+# -----------------------------------------------------
+# 업체별 발주량 규칙표(vendor_rules.json) 컴파일 + 조회 계획
+#   - 토요일 → 토·일 합산, 컬리 토요일 → 일요일, 코스트코 조회일/월요일 보정,
+#     PACSU 곱하기, 팩중량 환산을 코드 대신 규칙표로 표현
+#   - plan() / plan_dates() 는 품목 목록을 원천별 최소 조회 집합으로 묶는다 (같은 원천은 키/날짜를 합쳐 한 번만)
+# -----------------------------------------------------
+
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+from UTIL.sql_registry import STATEMENTS
+from logic.master_data import code_index
+
+RULES_PATH = os.environ.get("DASHBOARD_VENDOR_RULES") or \
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "vendor_rules.json")
+
+WEEKDAYS = ("MON", "TUE", "WED", "THU", "FRI", "SAT", "SUN")
+TRANSLATORS = {
+    "tco_to_co": lambda key: code_index.tco_to_co(key),
+    "co_to_tco3": lambda key: code_index.co_to_tco3(key),
+}
+
+
+def _weekday(name: str, where: str) -> int:
+    try:
+        return WEEKDAYS.index(str(name).upper())
+    except ValueError:
+        raise ValueError(f"[vendor_rules] {where}: 알 수 없는 요일 '{name}' ({'/'.join(WEEKDAYS)})")
+
+
+class DateRule:
+    """입고일 → 조회일 목록"""
+
+    def __init__(self, spec: dict, where: str):
+        self.offsets = [int(v) for v in spec.get("offsets", [0])]
+        self.by_weekday = {_weekday(k, where): [int(v) for v in vals]
+                           for k, vals in spec.get("by_weekday", {}).items()}
+        self.target_adjust = {_weekday(k, where): int(v) for k, v in spec.get("target_adjust", {}).items()}
+        self.skip_targets = {_weekday(k, where) for k in spec.get("skip_targets", [])}
+
+    def targets(self, sdate_str: str) -> list:
+        sdate = datetime.strptime(sdate_str, "%Y-%m-%d")
+        result = []
+        for off in self.by_weekday.get(sdate.weekday(), self.offsets):
+            target = sdate + timedelta(days=off)
+            target += timedelta(days=self.target_adjust.get(target.weekday(), 0))
+            if target.weekday() in self.skip_targets:
+                continue
+            day = target.strftime("%Y-%m-%d")
+            if day not in result:
+                result.append(day)
+        return result
+
+
+class Source:
+    def __init__(self, name: str, spec: dict):
+        self.name = name
+        self.db = spec["db"]
+        self.statement = spec["statement"]
+        self.keys_param = spec.get("keys_param")
+        self.per_date = bool(spec.get("per_date", False))
+        self.cached = bool(spec.get("cached", False))
+        self.watermark = spec.get("watermark")
+        for stmt in (self.statement, self.watermark):
+            if stmt and stmt not in STATEMENTS:
+                raise ValueError(f"[vendor_rules] source {name}: 등록되지 않은 문장 '{stmt}'")
+
+
+class VendorRule:
+    FIELDS = ("source", "translate", "pacsu", "pack_weight", "type", "dates", "allow_dates_override")
+
+    def __init__(self, vendor: str, spec: dict, sources: dict, where: str):
+        self.vendor = vendor
+        if spec.get("source") not in sources:
+            raise ValueError(f"[vendor_rules] {where}: 알 수 없는 source '{spec.get('source')}'")
+        if spec.get("translate") and spec["translate"] not in TRANSLATORS:
+            raise ValueError(f"[vendor_rules] {where}: 알 수 없는 translate '{spec['translate']}'")
+        self.source = sources[spec["source"]]
+        self.translate = spec.get("translate")
+        self.pacsu = bool(spec.get("pacsu", False))
+        self.pack_weight = float(spec.get("pack_weight", 0) or 0)
+        self.type = spec.get("type", "")
+        self.dates = DateRule(spec.get("dates", {}), where)
+        self.allow_dates_override = bool(spec.get("allow_dates_override", False))
+
+    def key_of(self, co: str) -> str:
+        return TRANSLATORS[self.translate](co) if self.translate else co
+
+    def quantity(self, total, pacsu: int) -> int:
+        """원천 합계 → 발주팩"""
+        qty = int(total or 0)
+        if self.pack_weight > 0:
+            qty = int(round(qty / self.pack_weight))
+        if self.pacsu:
+            qty *= pacsu if pacsu and pacsu > 0 else 1
+        return qty
+
+
+class VendorRuleSet:
+    """컴파일된 규칙표. rule_for(vendor, co) / plan(products, sdate)"""
+
+    def __init__(self, raw: dict):
+        self.sources = {name: Source(name, spec) for name, spec in raw.get("sources", {}).items()}
+        self.vendors = {}
+        self.products = {}
+        self.products_only = set()
+        for vendor, spec in raw.get("vendors", {}).items():
+            base = {k: v for k, v in spec.items() if k in VendorRule.FIELDS}
+            self.vendors[vendor] = VendorRule(vendor, base, self.sources, vendor)
+            if spec.get("products_only"):
+                self.products_only.add(vendor)
+            for co, override in spec.get("products", {}).items():
+                merged = dict(base, **{k: v for k, v in override.items() if k in VendorRule.FIELDS})
+                self.products[(vendor, str(co))] = VendorRule(vendor, merged, self.sources, f"{vendor}/{co}")
+
+    def rule_for(self, vendor: str, co: str) -> Optional[VendorRule]:
+        rule = self.products.get((vendor, co))
+        if rule is None and vendor not in self.products_only:
+            rule = self.vendors.get(vendor)
+        return rule
+
+    def plan(self, products: list, sdate_str: str, dates_override: list = None,
+             into: "OrderPlan" = None) -> "OrderPlan":
+        """into 를 넘기면 기존 계획에 이 입고일 품목을 더한다 (여러 날짜를 같은 조회로 묶을 때)"""
+        plan = into if into is not None else OrderPlan()
+        for co, vendor in products:
+            co = str(co).strip()
+            vendor = (vendor or "").strip()
+            if not co:
+                continue
+            rule = self.rule_for(vendor, co)
+            if rule is None:
+                plan.add_item(sdate_str, co, None, None, [], None)
+                continue
+
+            dates = list(dates_override) if dates_override and rule.allow_dates_override \
+                else rule.dates.targets(sdate_str)
+            key = rule.key_of(co) if rule.source.keys_param else co
+            if not key or not dates:
+                plan.add_item(sdate_str, co, rule, None, [], None)
+                continue
+
+            src = rule.source
+            qid = src.name if src.per_date else (src.name, tuple(sorted(dates)))
+            query = plan.queries.setdefault(qid, PlannedQuery(src))
+            query.dates.update(dates)
+            if src.keys_param:
+                query.keys.add(key)
+            plan.add_item(sdate_str, co, rule, key, dates, qid)
+        return plan
+
+    def plan_dates(self, products: list, sdates: list) -> "OrderPlan":
+        """여러 입고일을 한 계획으로 — 원천별 조회는 날짜를 합쳐 한 번"""
+        plan = OrderPlan()
+        for sdate_str in sdates:
+            self.plan(products, sdate_str, into=plan)
+        return plan
+
+
+class PlannedQuery:
+    def __init__(self, source: Source):
+        self.source = source
+        self.keys = set()
+        self.dates = set()
+
+    def params(self) -> dict:
+        params = {"dates": sorted(self.dates)}
+        if self.source.keys_param:
+            params[self.source.keys_param] = sorted(self.keys)
+        return params
+
+    def collect_watermarks(self, df) -> dict:
+        """
+        변경 감지 결과 (키, 날짜, 행 수, 체크섬) → {(source 이름, 'yyyy-MM-dd'): {key: (행 수, 체크섬)}}
+        조회한 날짜는 행이 없어도 빈 dict 로 남긴다 (그 날짜를 봤다는 표시)
+        """
+        result = {(self.source.name, d): {} for d in self.dates}
+        if df is not None and not df.empty:
+            for key, day, cnt, chk in zip(df.iloc[:, 0], df.iloc[:, 1], df.iloc[:, 2], df.iloc[:, 3]):
+                result.setdefault((self.source.name, str(day)[:10]), {})[str(key).strip()] = \
+                    (int(cnt or 0), None if chk != chk else chk)
+        return result
+
+    def collect(self, df) -> dict:
+        """조회 결과 → per_date: {(key, 'yyyy-MM-dd'): 값}, 아니면 {key: 값}"""
+        result = {}
+        if df is None or df.empty:
+            return result
+        if self.source.per_date:
+            for key, day, val in zip(df.iloc[:, 0], df.iloc[:, 1], df.iloc[:, 2]):
+                result[(str(key).strip(), str(day)[:10])] = val
+        else:
+            for key, val in zip(df.iloc[:, 0], df.iloc[:, 1]):
+                result.setdefault(str(key).strip(), val)
+        return result
+
+
+class OrderPlan:
+    def __init__(self):
+        self.items = []         # [(sdate, co, rule, key, dates, qid)]
+        self.queries = {}       # {qid: PlannedQuery}
+
+    def add_item(self, sdate, co, rule, key, dates, qid) -> None:
+        self.items.append((sdate, co, rule, key, dates, qid))
+
+    def cos(self) -> list:
+        return list(dict.fromkeys(co for _, co, _, _, _, _ in self.items))
+
+    def needs_pacsu(self) -> list:
+        return list(dict.fromkeys(co for _, co, rule, _, _, _ in self.items
+                                  if rule is not None and rule.pacsu))
+
+    def watermark_queries(self, keys: dict = None) -> dict:
+        """원천별 변경 감지 조회 {source 이름: PlannedQuery}. keys 로 원천별 키 집합을 넓힐 수 있다"""
+        out = {}
+        for query in self.queries.values():
+            src = query.source
+            if not src.watermark:
+                continue
+            wq = out.setdefault(src.name, PlannedQuery(src))
+            wq.dates |= query.dates
+            wq.keys |= query.keys
+            if keys and src.keys_param:
+                wq.keys |= set(keys.get(src.name, ()))
+        return out
+
+    def changed_cos(self, old: dict, new: dict, sdate: str = None) -> set:
+        """
+        old / new: {(source 이름, 'yyyy-MM-dd'): {key: (행 수, 체크섬)}}
+        조회일 중 하나라도 자기 키의 워터마크가 달라진 품목만 (워터마크 없는 원천, 이전에 안 본 날짜는 변경으로 본다)
+        """
+        changed = set()
+        for item_sdate, co, rule, key, dates, qid in self.items:
+            if qid is None or (sdate is not None and item_sdate != sdate):
+                continue
+            src = rule.source.name
+            if not rule.source.watermark or any(
+                    (src, d) not in old or (src, d) not in new
+                    or old[(src, d)].get(key, (0, None)) != new[(src, d)].get(key, (0, None))
+                    for d in dates):
+                changed.add(co)
+        return changed
+
+    def evaluate(self, results: dict, pacsu_map: dict) -> dict:
+        """results: {qid: collect() 결과} → {sdate: {co: 발주팩}} (품목 순서 유지)"""
+        out = {}
+        for sdate, co, rule, key, dates, qid in self.items:
+            day = out.setdefault(sdate, {})
+            if qid is None:
+                day.setdefault(co, 0)
+                continue
+            got = results.get(qid, {})
+            if rule.source.per_date:
+                total = sum(_num(got.get((key, d))) for d in dates)
+            else:
+                total = _num(got.get(key))
+            day[co] = rule.quantity(total, pacsu_map.get(co, 1))
+        return out
+
+
+def _num(val) -> float:
+    try:
+        val = float(val)
+    except (TypeError, ValueError):
+        return 0
+    return 0 if val != val else val      # NaN → 0
+
+
+# -----------------------------------------------------
+# 규칙표 로딩 (1회 컴파일, 파일 수정 후 reload_vendor_rules())
+# -----------------------------------------------------
+_rules = None
+_rules_lock = threading.Lock()
+
+
+def load_vendor_rules(path: str = RULES_PATH) -> VendorRuleSet:
+    with open(path, encoding="utf-8") as f:
+        return VendorRuleSet(json.load(f))
+
+
+def get_vendor_rules() -> VendorRuleSet:
+    global _rules
+    with _rules_lock:
+        if _rules is None:
+            _rules = load_vendor_rules()
+        return _rules
+
+
+def reload_vendor_rules(path: str = RULES_PATH) -> VendorRuleSet:
+    global _rules
+    rules = load_vendor_rules(path)
+    with _rules_lock:
+        _rules = rules
+    return rules
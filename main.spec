@@ -5,7 +5,7 @@ a = Analysis(
     ['main.py'],
     pathex=[],
     binaries=[],
-    datas=[],
+    datas=[('logic/vendor_rules.json', 'logic')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
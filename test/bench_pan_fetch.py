@@ -0,0 +1,65 @@
+# bench_pan_fetch.py
+# PAN 50k 행 조회: UTF-8 접속 + 재인코딩(기존) vs 서버 charset 접속(재인코딩 생략) rows/sec 비교
+
+import sys
+import time
+
+import pandas as pd
+
+from UTIL.db_handler import _connect, dfencoding_auto, clear_encoding_cache, closedb
+
+DB = "GFOOD_B"
+ROWS = 50000
+SQL = f"SELECT TOP {ROWS} * FROM PAN ORDER BY PKEY DESC"
+
+
+def legacy_decode(df: pd.DataFrame) -> pd.DataFrame:
+    """기존 runquery 의 셀 단위 apply 경로 — 모든 문자열 셀을 하나씩 latin1 → euc-kr 변환 (비교용)"""
+    def decode_if_needed(val):
+        if isinstance(val, str):
+            return val.encode("latin1", errors="replace").decode("euc-kr", errors="replace")
+        return val
+
+    for col in df.select_dtypes(include="object").columns:
+        df[col] = df[col].apply(decode_if_needed)
+    return df
+
+
+def fetch(charset: str, reencode):
+    conn = _connect(DB, charset=charset)
+    try:
+        cur = conn.cursor()
+        t0 = time.perf_counter()
+        cur.execute(SQL)
+        rows = cur.fetchall()
+        df = pd.DataFrame(rows, columns=[c[0] for c in cur.description])
+        if reencode:
+            clear_encoding_cache()
+            df = reencode(df)
+        dt = time.perf_counter() - t0
+    finally:
+        closedb(conn)
+    return df, dt
+
+
+def main(server_charset: str = "CP949"):
+    cases = [
+        ("before: UTF-8 + per-cell apply", "UTF-8", legacy_decode),
+        ("UTF-8 + column dfencoding_auto", "UTF-8", dfencoding_auto),
+        (f"after : {server_charset} (driver decode)", server_charset, None),
+    ]
+
+    results = []
+    for label, charset, reencode in cases:
+        df, dt = fetch(charset, reencode)
+        rps = len(df) / dt if dt > 0 else 0
+        results.append((label, len(df), dt, rps))
+        print(f"{label:<40} rows={len(df):>6}  {dt:7.3f} s  {rps:>10,.0f} rows/sec")
+
+    base = results[0][3]
+    if base > 0:
+        print(f"speedup (after / before) x{results[-1][3] / base:.2f}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
@@ -0,0 +1,61 @@
+# test_vendor_rules.py
+# 규칙표 조회 계획 검증 (DB 없이 원천 테이블을 메모리로 흉내)
+#   python -m pytest -q test/test_vendor_rules.py
+
+import pandas as pd
+
+from logic.order_prefetch import prefetch_window
+from logic.vendor_rules import get_vendor_rules
+
+# MJEN (JNO, SDATE) — J2 는 금·토 두 날짜에 걸친 전표
+MJEN = [("J1", "2026-10-16"), ("J2", "2026-10-16"), ("J2", "2026-10-17"), ("J3", "2026-10-18")]
+# MPAN (JNO, CO, PANKG)
+MPAN = [("J1", "100", 3), ("J2", "100", 5), ("J2", "200", 7), ("J3", "100", 11)]
+
+
+def _lotte_baseline(co: str, dates: list) -> float:
+    """기존 2단계 조회: 조회일들의 JNO 집합 → 그 JNO 의 MPAN 을 행마다 한 번"""
+    jnos = {jno for jno, d in MJEN if d in dates}
+    return sum(kg for jno, c, kg in MPAN if jno in jnos and c == co)
+
+
+def _fake_source(query) -> pd.DataFrame:
+    """lotte.sum_pankg_by_co 와 같은 의미: 조회일 목록의 JNO 집합 → CO 별 합계"""
+    assert query.source.name == "LOTTE_MPAN"
+    jnos = {jno for jno, d in MJEN if d in query.params()["dates"]}
+    sums = {}
+    for jno, co, kg in MPAN:
+        if jno in jnos:
+            sums[co] = sums.get(co, 0) + kg
+    return pd.DataFrame(list(sums.items()), columns=["CO", "sum_pan"])
+
+
+def _evaluate(plan) -> dict:
+    results = {qid: q.collect(_fake_source(q)) for qid, q in plan.queries.items()}
+    return plan.evaluate(results, {"100": 1, "200": 1})
+
+
+def test_lotte_sum_same_alone_and_in_window():
+    rules = get_vendor_rules()
+    products = [("100", "롯데"), ("200", "롯데")]
+    for sdate in ("2026-10-16", "2026-10-17", "2026-10-18"):      # 금, 토(토·일 합산), 일
+        alone = _evaluate(rules.plan(products, sdate))[sdate]
+        window = _evaluate(rules.plan_dates(products, prefetch_window(sdate)))[sdate]
+        assert alone == window
+        for co, _ in products:
+            dates = rules.rule_for("롯데", co).dates.targets(sdate)
+            assert alone[co] == _lotte_baseline(co, dates)
+
+
+def test_changed_cos_only_moved_keys():
+    rules = get_vendor_rules()
+    sdate = "2026-10-15"
+    plan = rules.plan([("100", "홈플러스"), ("200", "홈플러스")], sdate)
+    query = plan.watermark_queries()["PAN"]
+    old = query.collect_watermarks(pd.DataFrame(
+        [("100", sdate, 2, 11), ("200", sdate, 1, 22)], columns=["CO", "d", "cnt", "chk"]))
+    new = query.collect_watermarks(pd.DataFrame(
+        [("100", sdate, 3, 12), ("200", sdate, 1, 22)], columns=["CO", "d", "cnt", "chk"]))
+    assert plan.changed_cos(old, new) == {"100"}
+    assert plan.changed_cos(old, old) == set()
+    assert plan.changed_cos({}, new) == {"100", "200"}          # 이전에 안 본 날짜